@@ -12,18 +12,257 @@ Run from your PROJECT directory:
     python /path/to/OctoSodales.py
 """
 
-import anthropic
+import asyncio
+import atexit
+import fnmatch
+import functools
+import hashlib
+import importlib.util
+import io
+import itertools
 import json
+import logging
+import logging.handlers
 import os
+import queue
+import random
+import re
+import shlex
 import subprocess
-from dataclasses import dataclass, field, asdict
-from typing import List, Optional
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field, fields
+from typing import Callable, Dict, Iterator, List, Literal, Optional, Tuple, Union, get_args
 from pathlib import Path
+from stat import S_ISREG
 
-client = anthropic.Anthropic()
+try:
+    import orjson  # Optional: much faster JSON encode/decode
+except ImportError:
+    orjson = None
 
-# Save file location
+try:
+    from typing_extensions import TypedDict  # pydantic only validates this one on Python < 3.12
+except ImportError:
+    from typing import TypedDict
+
+# API clients are created on first use: importing anthropic (httpx, pydantic, ...)
+# costs hundreds of ms, and menu actions like the roadmap never need it
+_client = None
+_async_client = None
+_async_http = None
+
+
+# Guards client creation: warm_up() may race the first real call from another thread
+_client_lock = threading.Lock()
+
+
+def _http_options() -> dict:
+    """Connection settings shared by both clients' HTTP pools."""
+    import httpx
+    return {
+        "http2": importlib.util.find_spec("h2") is not None,
+        "limits": httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    }
+
+
+def _get_client():
+    """The ONE sync client for the whole process (streams, batches, warm-up).
+    
+    Same rules as `_get_async_client`: every Agent shares its pool, so
+    back-to-back calls reuse one warm connection.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            import anthropic
+            _client = anthropic.Anthropic(http_client=anthropic.DefaultHttpxClient(**_http_options()))
+    return _client
+
+
+def _get_async_client():
+    """The ONE async client for the whole process.
+    
+    Every Agent shares its keep-alive pool, and with HTTP/2 (needs the optional
+    `h2` package) concurrent agent calls are multiplexed over a single
+    connection. Agents must never create their own client.
+    """
+    global _async_client, _async_http
+    with _client_lock:
+        if _async_client is None:
+            import anthropic
+            _async_http = anthropic.DefaultAsyncHttpxClient(**_http_options())
+            _async_client = anthropic.AsyncAnthropic(http_client=_async_http)
+            atexit.register(_close_async_http)
+    return _async_client
+
+
+def warm_up():
+    """Open both clients' API connections in the background.
+    
+    The first agent call then skips the anthropic import and the DNS/TCP/TLS
+    handshake. Listing one model costs no tokens.
+    """
+    async def aping():
+        await _get_async_client().models.list(limit=1)  # A paginator, so wrap it in a coroutine
+    
+    def ping():
+        try:
+            _get_client().models.list(limit=1)
+            _run_async(aping())
+        except Exception as e:  # No key / offline: the first real call reports it properly
+            log.debug("Warm-up failed: %s", e)
+    
+    threading.Thread(target=ping, name="octo-warmup", daemon=True).start()
+
+
+def _close_async_http():
+    # Best effort: the pool has to be closed on the loop that opened its connections
+    try:
+        if _loop is not None:
+            asyncio.run_coroutine_threadsafe(_async_http.aclose(), _loop).result(timeout=5)
+    except Exception:
+        pass
+
+
+# One long-lived event loop, in a daemon thread, runs every async agent call made
+# from sync code. asyncio.run() would build a fresh loop per call and strand the
+# async client's keep-alive connections (and LLM_SEMAPHORE) on a closed loop.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _run_async(coro):
+    """Run a coroutine on the shared background loop and block until it finishes."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="octo-async", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+# Cap on in-flight async LLM requests so a gather() over many agents stays
+# under the account's rate limits instead of bursting into 429s
+LLM_SEMAPHORE = asyncio.Semaphore(int(os.getenv("OCTO_MAX_CONCURRENCY", "6")))
+RATE_LIMIT_RETRIES = 6
+
+# Responses kept per agent that caches them (see Agent.cache_responses),
+# persisted between sessions
+RESPONSE_CACHE_SIZE = 128
+RESPONSE_CACHE_FILE = Path.home() / ".octosodales_responses.json"
+# OCTO_FRESH_RESPONSES=1 ignores stored replies; the fresh ones replace them
+FRESH_RESPONSES = os.getenv("OCTO_FRESH_RESPONSES") == "1"
+# Only a reply that finished on its own is worth replaying (not one cut off at max_tokens)
+_COMPLETE_STOP_REASONS = frozenset({"end_turn", "tool_use"})
+
+# Upper bound on one API request inside a concurrent round, so a single slow
+# response can't hold up the others (time queued for a slot doesn't count)
+AGENT_TIMEOUT = 120
+
+log = logging.getLogger("octosodales")
+
+
+def setup_logging():
+    """Send the 'octosodales' logger to stdout from a background thread.
+    
+    Records go onto a queue and a listener thread does the terminal write, so
+    status messages (saves, loads) never block the caller on a slow flush.
+    Level comes from OCTO_LOG_LEVEL (default INFO; DEBUG adds per-call token usage).
+    """
+    if log.handlers:
+        return
+    records: queue.Queue = queue.Queue(-1)
+    stdout = logging.StreamHandler(sys.stdout)
+    stdout.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(records, stdout)
+    listener.start()
+    atexit.register(listener.stop)  # Drains anything still queued
+    log.addHandler(logging.handlers.QueueHandler(records))
+    log.setLevel(os.getenv("OCTO_LOG_LEVEL", "INFO").upper())
+    log.propagate = False
+
+# Save file location: a full snapshot plus an append-only log of per-save changes
 SAVE_FILE = Path.home() / ".octosodales_progress.json"
+SAVE_LOG = SAVE_FILE.with_suffix(".jsonl")
+SNAPSHOT_EVERY = 20  # saves between full snapshots (which also truncate the log)
+SAVE_DEBOUNCE = 2.0  # seconds; a save this soon after the last write is deferred
+
+
+def _compact_prompt(text: str) -> str:
+    """Drop trailing whitespace and runs of blank lines - they cost input tokens on every call."""
+    return re.sub(r"\n{3,}", "\n\n", re.sub(r"[ \t]+\n", "\n", text)).strip() + "\n"
+
+
+def _json_compact(data) -> bytes:
+    """Compact JSON as UTF-8 bytes - orjson when installed, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode('utf-8')
+
+
+def _json_object(encoded: Dict[str, bytes], sep: bytes = b",") -> bytes:
+    """Assemble a JSON object from already-encoded values, so nothing is encoded twice."""
+    return b"{" + sep.join(_json_compact(k) + b":" + v for k, v in encoded.items()) + b"}"
+
+
+def _json_text(data) -> str:
+    """Indented JSON for prompts and terminal output (orjson when installed).
+    
+    Anything JSON has no type for (a Path, a set, a ProjectSpec) is shown via
+    str() rather than failing the whole menu command.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(data, indent=2, ensure_ascii=False, default=str)
+
+
+def _json_canonical(data) -> str:
+    """Compact JSON with sorted keys: equal content always renders to the same text."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS).decode('utf-8')
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, sort_keys=True)
+
+
+def _json_loads(raw: Union[str, bytes]):
+    """Parse JSON text or bytes. Raises json.JSONDecodeError (orjson's error subclasses it)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# agent name -> request hash -> response text, oldest first; loaded on first use
+_response_caches: Optional[Dict[str, 'OrderedDict[str, str]']] = None
+_response_caches_dirty = False
+_response_caches_lock = threading.Lock()
+
+
+def _response_cache(agent_name: str) -> 'OrderedDict[str, str]':
+    """One agent's slice of the on-disk response cache."""
+    global _response_caches
+    with _response_caches_lock:
+        if _response_caches is None:
+            try:
+                stored = _json_loads(RESPONSE_CACHE_FILE.read_bytes())
+            except (OSError, ValueError):  # Missing or corrupt: start empty
+                stored = {}
+            _response_caches = {name: OrderedDict(entries) for name, entries in stored.items()}
+            atexit.register(_save_response_caches)
+        return _response_caches.setdefault(agent_name, OrderedDict())
+
+
+def _save_response_caches():
+    """Write the response caches back at exit, if anything was added."""
+    if not _response_caches_dirty:
+        return
+    try:
+        tmp = RESPONSE_CACHE_FILE.with_suffix('.tmp')
+        tmp.write_bytes(_json_compact(_response_caches))
+        os.replace(tmp, RESPONSE_CACHE_FILE)
+    except OSError as e:
+        log.warning("⚠️  Could not save response cache: %s", e)
 
 # Model configuration
 MODELS = {
@@ -35,7 +274,7 @@ MODELS = {
 # MODERN STANDARDS - All agents use this
 # =============================================================================
 
-MODERN_STANDARDS = """
+MODERN_STANDARDS = _compact_prompt("""
 🚨 MODERN PYTHON STANDARDS (applies to ALL agents):
 
 ALWAYS USE/ACCEPT THESE MODERN TOOLS:
@@ -54,23 +293,76 @@ ALWAYS USE/ACCEPT THESE MODERN TOOLS:
 If a task mentions an outdated tool, USE THE MODERN ONE INSTEAD.
 If reviewing code that uses modern tools, ACCEPT IT even if task said otherwise.
 Modern > outdated. Always.
-"""
+""")
 
 
 # =============================================================================
 # PROJECT CONTEXT - Agents can see your files
 # =============================================================================
 
+@functools.lru_cache(maxsize=64)
+def _read_text_cached(path: str, mtime_ns: int, size: int) -> str:
+    """A file's text, reused for as long as its (mtime, size) stamp is unchanged."""
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
 class ProjectContext:
     """Gives agents access to your project files."""
     
-    IGNORE_DIRS = {'.git', '__pycache__', 'venv', '.venv', 'node_modules', '.mypy_cache', '.pytest_cache', 'dist', 'build', '*.egg-info'}
+    # Exact names are a single set lookup; only names that miss fall through to the globs
+    IGNORE_DIRS = frozenset({'.git', '__pycache__', 'venv', '.venv', 'node_modules', '.mypy_cache', '.pytest_cache', 'dist', 'build'})
+    IGNORE_GLOBS = ('*.egg-info',)
     CODE_EXTENSIONS = {'.py', '.toml', '.yaml', '.yml', '.json', '.md', '.txt', '.cfg', '.ini'}
     
     def __init__(self, project_dir: str = "."):
         self.project_dir = Path(project_dir).resolve()
+        # Last full context and the fingerprint it was built from
+        self._context: Optional[Tuple[frozenset, str]] = None
+        self._dmypy_started = False
+        # The daemon's status file lives outside the learner's project (one per project dir)
+        digest = hashlib.blake2b(str(self.project_dir).encode(), digest_size=8).hexdigest()
+        self._dmypy_status = Path(tempfile.gettempdir()) / f"octosodales-dmypy-{digest}.json"
         print(f"📁 Project directory: {self.project_dir}")
     
+    @classmethod
+    def _is_ignored(cls, name: str) -> bool:
+        return name in cls.IGNORE_DIRS or any(fnmatch.fnmatchcase(name, pattern) for pattern in cls.IGNORE_GLOBS)
+    
+    def _scan(self):
+        """Yield every os.DirEntry under the project, never descending into ignored dirs."""
+        stack = [str(self.project_dir)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name.startswith('.') or self._is_ignored(entry.name):
+                                continue
+                            stack.append(entry.path)
+                        yield entry
+            except OSError:
+                continue
+    
+    def _iter_py_files(self):
+        # Sorted: scandir order is up to the filesystem, and the code dump has to be
+        # byte-identical between calls for its prompt-cache prefix to be reused
+        return iter(sorted(
+            Path(entry.path) for entry in self._scan()
+            if entry.name.endswith('.py') and entry.is_file()
+        ))
+    
+    def _fingerprint(self) -> frozenset:
+        """Cheap snapshot of the project: (path, mtime, size) of every non-ignored entry."""
+        entries = set()
+        for entry in self._scan():
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            entries.add((entry.path, stat.st_mtime_ns, stat.st_size))
+        return frozenset(entries)
+    
     def get_tree(self, max_depth: int = 3) -> str:
         """Get project file tree."""
         lines = [f"📁 {self.project_dir.name}/"]
@@ -81,33 +373,40 @@ class ProjectContext:
         if depth >= max_depth:
             return
         
+        # DirEntry caches its type from readdir, so sorting and the is_dir() check
+        # below don't stat each entry again
         try:
-            items = sorted(path.iterdir(), key=lambda x: (x.is_file(), x.name))
+            with os.scandir(path) as it:
+                items = sorted(it, key=lambda e: (e.is_file(follow_symlinks=False), e.name))
         except PermissionError:
             return
         
         for item in items:
             if item.name.startswith('.') and item.name not in ['.env.example']:
                 continue
-            if item.name in self.IGNORE_DIRS:
+            if self._is_ignored(item.name):
                 continue
             
-            if item.is_dir():
+            if item.is_dir(follow_symlinks=False):
                 lines.append(f"{prefix}📁 {item.name}/")
-                self._walk_tree(item, lines, prefix + "  ", max_depth, depth + 1)
+                self._walk_tree(Path(item.path), lines, prefix + "  ", max_depth, depth + 1)
             else:
                 lines.append(f"{prefix}📄 {item.name}")
     
     def read_file(self, relative_path: str) -> str:
         """Read a file's contents."""
         file_path = self.project_dir / relative_path
-        if not file_path.exists():
+        # One stat answers exists / is-a-file and stamps the read cache; a
+        # review-edit-review loop re-reads the same file many times over
+        try:
+            st = file_path.stat()
+        except OSError:
             return f"❌ File not found: {relative_path}"
-        if not file_path.is_file():
+        if not S_ISREG(st.st_mode):
             return f"❌ Not a file: {relative_path}"
         
         try:
-            content = file_path.read_text(encoding='utf-8')
+            content = _read_text_cached(str(file_path), st.st_mtime_ns, st.st_size)
             ext = file_path.suffix
             lang = "python" if ext == ".py" else "toml" if ext == ".toml" else ""
             return f"📄 {relative_path}:\n```{lang}\n{content}\n```"
@@ -116,24 +415,20 @@ class ProjectContext:
     
     def read_all_python_files(self) -> str:
         """Read all Python files in the project."""
-        files_content = []
+        buf = io.StringIO()
         
-        for py_file in self.project_dir.rglob("*.py"):
-            # Skip ignored directories
-            if any(part in self.IGNORE_DIRS for part in py_file.parts):
-                continue
-            
-            relative = py_file.relative_to(self.project_dir)
+        for py_file in self._iter_py_files():
             try:
                 content = py_file.read_text(encoding='utf-8')
-                files_content.append(f"📄 {relative}:\n```python\n{content}\n```")
-            except:
-                continue
-        
-        if not files_content:
-            return "📁 No Python files found yet."
-        
-        return "\n\n".join(files_content)
+            except (OSError, UnicodeDecodeError):
+                continue  # Unreadable files are skipped
+            if buf.tell():
+                buf.write("\n\n")
+            buf.write(f"📄 {py_file.relative_to(self.project_dir)}:\n```python\n")
+            buf.write(content)
+            buf.write("\n```")
+        
+        return buf.getvalue() or "📁 No Python files found yet."
     
     def read_project_config(self) -> str:
         """Read pyproject.toml, setup.py, or setup.cfg if they exist."""
@@ -150,41 +445,77 @@ class ProjectContext:
         
         return "\n\n".join(configs) if configs else "📁 No config files yet."
     
-    def run_command(self, command: str) -> str:
-        """Run a shell command in the project directory."""
+    def run_command(self, command: Union[str, List[str]]) -> str:
+        """Run a command in the project directory (no shell - strings are split shell-style)."""
+        return self._run_command(command)[1]
+    
+    def _run_command(self, command: Union[str, List[str]]) -> Tuple[Optional[int], str]:
+        """`run_command`, also returning the exit code (None if the command never finished)."""
+        args = shlex.split(command, posix=(os.name != 'nt')) if isinstance(command, str) else command
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
+            # stderr is merged into stdout so the output keeps its real interleaving
+            # and there is a single bytes buffer to decode
+            with subprocess.Popen(
+                args,
                 cwd=self.project_dir,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            output = ""
-            if result.stdout:
-                output += f"{result.stdout}\n"
-            if result.stderr:
-                output += f"{result.stderr}\n"
-            if result.returncode != 0:
-                output += f"(Exit code: {result.returncode})"
-            return output.strip() or "✅ Command completed (no output)"
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT
+            ) as proc:
+                try:
+                    raw, _ = proc.communicate(timeout=60)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.communicate()
+                    raise
+            output = raw.decode('utf-8', errors='replace').strip()
+            if proc.returncode != 0:
+                output += f"\n(Exit code: {proc.returncode})"
+            return proc.returncode, output.strip() or "✅ Command completed (no output)"
         except subprocess.TimeoutExpired:
-            return "❌ Command timed out after 60 seconds"
+            return None, "❌ Command timed out after 60 seconds"
         except Exception as e:
-            return f"❌ Error running command: {e}"
+            return None, f"❌ Error running command: {e}"
     
     def run_pytest(self) -> str:
         """Run pytest."""
-        return self.run_command("python -m pytest -v")
+        return self.run_command(["python", "-m", "pytest", "-v"])
     
     def run_mypy(self) -> str:
-        """Run mypy type checking."""
-        return self.run_command("python -m mypy .")
+        """Run mypy type checking through the mypy daemon (dmypy).
+        
+        The first call starts the daemon; later calls reuse its in-memory type
+        graph and only recheck changed files. The daemon is stopped at exit.
+        """
+        returncode, output = self._run_command(
+            ["python", "-m", "mypy.dmypy", "--status-file", str(self._dmypy_status), "run", "--", "."]
+        )
+        # 0 = clean, 1 = type errors - but python exits 1 too when mypy isn't
+        # installed, so only a status file written by the daemon proves it's up.
+        # Otherwise nothing is recorded and the next call tries again.
+        if not self._dmypy_started and returncode in (0, 1) and self._dmypy_status.exists():
+            self._dmypy_started = True
+            atexit.register(self._stop_dmypy)
+        return output
+    
+    def _stop_dmypy(self):
+        try:
+            subprocess.run(
+                ["python", "-m", "mypy.dmypy", "--status-file", str(self._dmypy_status), "stop"],
+                cwd=self.project_dir,
+                capture_output=True,
+                timeout=10
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            pass
     
     def get_full_context(self) -> str:
-        """Get full project context for agents."""
-        return f"""
+        """Get full project context for agents (cached until a file changes)."""
+        # One fingerprint walk (stats only) stands in for re-reading every file;
+        # the sections on their own are cheaper to rebuild than to validate
+        fingerprint = self._fingerprint()
+        if self._context is not None and self._context[0] == fingerprint:
+            return self._context[1]
+        context = f"""
 PROJECT STRUCTURE:
 {self.get_tree()}
 
@@ -194,285 +525,519 @@ CONFIG FILES:
 PYTHON CODE:
 {self.read_all_python_files()}
 """
+        self._context = (fingerprint, context)
+        return context
 
 
 # Initialize global project context
 project = ProjectContext(".")
 
 
+def _tool_json(message) -> str:
+    """Arguments of the message's tool calls, as JSON text."""
+    return "".join(_json_compact(block.input).decode('utf-8') for block in message.content if block.type == "tool_use")
+
+
+def _message_text(message) -> str:
+    """A reply as text - for a schema agent, the JSON its forced tool call carried."""
+    return "".join(block.text for block in message.content if block.type == "text") + _tool_json(message)
+
+
 class Agent:
-    def __init__(self, name: str, system_prompt: str, use_opus: bool = False):
+    """One LLM-backed role (Curriculum, Teacher, a coach, ...).
+
+    `run` blocks on the API call; `arun` is the same call on the async client so
+    several agents can be awaited together with `asyncio.gather`. An Agent holds
+    per-instance state (the coaching directive), so don't share one instance
+    between concurrently running tasks. All agents use the module-level clients.
+    """
+
+    def __init__(self, name: str, system_prompt: str, use_opus: bool = False, example: str = "",
+                 max_tokens: int = 4000, cache_responses: bool = False, temperature: Optional[float] = None,
+                 response_type: Optional[type] = None):
         self.name = name
-        self.system_prompt = system_prompt
+        self.system_prompt = _compact_prompt(system_prompt)
+        self.example = _compact_prompt(example) if example else ""  # Few-shot block for a new learner
         self.model = MODELS["opus"] if use_opus else MODELS["sonnet"]
+        self.max_tokens = max_tokens  # Output cap - generous for the agent's format, not a target
+        self.temperature = temperature  # None: the API default
+        self.response_type = response_type  # TypedDict the reply must match (see _params)
+        # Reuse the answer to a byte-identical request instead of paying for it again
+        self.cache_responses = cache_responses
+        # Session token totals - cache_read vs cache_write shows whether prompt caching is paying off
+        self.usage = {"calls": 0, "input": 0, "cache_read": 0, "cache_write": 0, "output": 0}
         self.coaching_directive = ""  # Injected by coach
     
     def set_coaching(self, directive: str):
         """Set coaching directive that modifies agent behavior."""
         self.coaching_directive = directive
     
-    def run(self, user_message: str, learner: 'BuilderProfile', include_code: bool = False) -> str:
-        # Build context
-        context = learner.to_context()
-        
-        # Add project code if requested
+    def _build_system(self, include_code: bool, code: Optional[str] = None, with_example: bool = False) -> list:
+        """System prompt as content blocks, most stable first.
+        
+        Anthropic caches the prompt prefix up to each `cache_control` marker, so
+        the static instructions and the project code (unchanged between most
+        calls) come before anything that changes per call. The code block sits
+        right after MODERN_STANDARDS - ahead of the agent's own prompt - so every
+        agent that reads the project shares one cached copy of an unchanged dump
+        instead of each agent paying to cache it separately.
+        """
+        cached = {"type": "ephemeral"}
+        
+        # ALL agents get modern standards
+        blocks = [{"type": "text", "text": MODERN_STANDARDS}]
+        
+        # Add project code if requested (arun passes it in, already built off-thread)
         if include_code:
-            context += f"\n\nCURRENT PROJECT CODE:\n{project.get_full_context()}"
+            if code is None:
+                code = project.get_full_context()
+            blocks.append({"type": "text", "text": f"CURRENT PROJECT CODE:\n{code}", "cache_control": cached})
+        
+        blocks.append({"type": "text", "text": self.system_prompt, "cache_control": cached})
         
-        # Inject coaching directive if present - PUT IT FIRST so it has highest priority
-        coaching_section = ""
+        # The worked example calibrates the first lessons; after that it's dead weight
+        if with_example:
+            blocks.append({"type": "text", "text": self.example, "cache_control": cached})
+        
+        # Inject coaching directive if present - flagged MANDATORY so it has highest priority.
+        # It only changes when a coach runs, so it's cached too (4 breakpoints at most: the API limit)
         if self.coaching_directive:
-            coaching_section = f"""
-🚨 MANDATORY COACHING DIRECTIVE - YOU MUST FOLLOW THIS:
+            blocks.append({"type": "text", "text": f"""🚨 MANDATORY COACHING DIRECTIVE - YOU MUST FOLLOW THIS:
 {self.coaching_directive}
 
 This directive comes from your coach based on student feedback. FOLLOW IT.
----
-
-"""
-        
-        # ALL agents get modern standards, coaching comes FIRST
-        full_system = f"{coaching_section}{MODERN_STANDARDS}\n\n{self.system_prompt}\n\n{context}"
-        
-        response = client.messages.create(
-            model=self.model,
-            max_tokens=4000,
-            system=full_system,
-            messages=[{"role": "user", "content": user_message}]
+""", "cache_control": cached})
+        return blocks
+    
+    def _params(self, user_message: str, learner: 'BuilderProfile', include_code: bool, code: Optional[str] = None) -> dict:
+        """Request parameters shared by every call path (run, stream, arun, batch).
+        
+        The learner profile changes nearly every turn, so it rides in the user
+        turn rather than the system prompt, which then stays byte-identical
+        between calls.
+        """
+        params = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "system": self._build_system(include_code, code, with_example=bool(self.example and not learner.tasks_completed)),
+            "messages": [{"role": "user", "content": [
+                {"type": "text", "text": learner.to_context()},
+                {"type": "text", "text": user_message},
+            ]}],
+        }
+        if self.temperature is not None:
+            params["temperature"] = self.temperature
+        schema = _json_schema(self.response_type) if self.response_type is not None else None
+        if schema is not None:
+            # Forced tool call: the API holds the reply to the schema, so there's
+            # no prose around the JSON and no malformed output to recover from
+            params["tools"] = [{"name": "respond", "description": "Give your answer.", "input_schema": schema}]
+            params["tool_choice"] = {"type": "tool", "name": "respond"}
+        return params
+    
+    def _record_usage(self, usage) -> None:
+        """Add one call's token counts to `self.usage` and log them at DEBUG."""
+        counts = {
+            "input": usage.input_tokens,
+            "cache_read": getattr(usage, "cache_read_input_tokens", None) or 0,
+            "cache_write": getattr(usage, "cache_creation_input_tokens", None) or 0,
+            "output": usage.output_tokens,
+        }
+        for key, n in counts.items():
+            self.usage[key] += n
+        self.usage["calls"] += 1
+        log.debug(
+            "%s: %s input, %s cache read, %s cache write, %s output tokens",
+            self.name, counts["input"], counts["cache_read"], counts["cache_write"], counts["output"],
         )
-        return response.content[0].text
+    
+    @staticmethod
+    def _request_key(params: dict) -> str:
+        return hashlib.sha256(_json_compact(params)).hexdigest()
+    
+    def _cached(self, key: str) -> Optional[str]:
+        if FRESH_RESPONSES:
+            return None
+        responses = _response_cache(self.name)
+        if key in responses:
+            responses.move_to_end(key)
+            log.debug("%s: response cache hit", self.name)
+            return responses[key]
+        return None
+    
+    def _remember(self, key: str, message, text: str):
+        global _response_caches_dirty
+        if message.stop_reason not in _COMPLETE_STOP_REASONS or not text.strip():
+            log.debug("%s: not caching a %s reply", self.name, message.stop_reason)
+            return
+        responses = _response_cache(self.name)
+        responses[key] = text
+        if len(responses) > RESPONSE_CACHE_SIZE:
+            responses.popitem(last=False)
+        _response_caches_dirty = True
+    
+    def run(self, user_message: str, learner: 'BuilderProfile', include_code: bool = False,
+            on_partial: Optional[Callable[[dict], None]] = None) -> str:
+        return "".join(self.stream(user_message, learner, include_code, on_partial))
+    
+    def stream(self, user_message: str, learner: 'BuilderProfile', include_code: bool = False,
+               on_partial: Optional[Callable[[dict], None]] = None) -> Iterator[str]:
+        """Yield the response text as it is generated instead of waiting for the end.
+        
+        For a structured agent, `on_partial` is called with the tool input parsed so
+        far each time more of it arrives, so fields can be acted on mid-stream.
+        """
+        params = self._params(user_message, learner, include_code)
+        key = self._request_key(params) if self.cache_responses else None
+        if key is not None and (text := self._cached(key)) is not None:
+            return iter((text,))
+        return self._stream(params, key, on_partial)
+    
+    def _stream(self, params: dict, cache_key: Optional[str] = None,
+                on_partial: Optional[Callable[[dict], None]] = None) -> Iterator[str]:
+        parts = []
+        with _get_client().messages.stream(**params) as response:
+            if on_partial is None:
+                for text in response.text_stream:
+                    parts.append(text)
+                    yield text
+            else:
+                for event in response:
+                    if event.type == "text":
+                        parts.append(event.text)
+                        yield event.text
+                    elif event.type == "input_json" and isinstance(event.snapshot, dict):
+                        # The SDK keeps the partially streamed tool input parsed for us
+                        on_partial(event.snapshot)
+            message = response.get_final_message()
+            self._record_usage(message.usage)
+            # A forced tool call streams no text - its JSON arrives with the final message
+            if tool_json := _tool_json(message):
+                parts.append(tool_json)
+                yield tool_json
+        if cache_key is not None:
+            self._remember(cache_key, message, "".join(parts))
+    
+    def batch_request(self, custom_id: str, user_message: str, learner: 'BuilderProfile', include_code: bool = False) -> dict:
+        """The same request `run` would send, as one entry for `submit_batch`."""
+        return {"custom_id": custom_id, "params": self._params(user_message, learner, include_code)}
+    
+    async def arun(self, user_message: str, learner: 'BuilderProfile', include_code: bool = False) -> str:
+        """Async version of `run` - await several of these with asyncio.gather.
+        
+        Only on the shared background loop (see `_run_async`): the async client's
+        pooled connections and LLM_SEMAPHORE are bound to it.
+        """
+        # Reading the project is blocking file I/O: run it in a worker thread so the
+        # event loop keeps servicing other agents' in-flight requests meanwhile
+        code = await asyncio.to_thread(project.get_full_context) if include_code else None
+        params = self._params(user_message, learner, include_code, code)
+        key = self._request_key(params) if self.cache_responses else None
+        if key is not None and (text := self._cached(key)) is not None:
+            return text
+        
+        async_client = _get_async_client()
+        from anthropic import RateLimitError
+        
+        for attempt in range(RATE_LIMIT_RETRIES):
+            try:
+                async with LLM_SEMAPHORE:
+                    # Timed from here, so waiting for a semaphore slot (or a
+                    # rate-limit backoff) doesn't count against the call
+                    response = await asyncio.wait_for(async_client.messages.create(**params), AGENT_TIMEOUT)
+                self._record_usage(response.usage)
+                text = _message_text(response)
+                if key is not None:
+                    self._remember(key, response, text)
+                return text
+            except RateLimitError:
+                if attempt == RATE_LIMIT_RETRIES - 1:
+                    raise
+                # Random exponential backoff (1s..30s), sleeping outside the semaphore
+                await asyncio.sleep(random.uniform(1, min(30, 2 ** (attempt + 1))))
+
+
+async def gather_agents(calls: List[tuple]) -> list:
+    """Run (agent, user_message, learner) calls concurrently.
+    
+    Total time is roughly the slowest call rather than the sum. A call that
+    fails or whose request exceeds AGENT_TIMEOUT (see `Agent.arun`) comes back
+    as its exception instead of sinking the whole round.
+    """
+    return await asyncio.gather(
+        *(agent.arun(message, learner) for agent, message, learner in calls),
+        return_exceptions=True,
+    )
+
+
+def submit_batch(requests: List[dict]) -> str:
+    """Submit `Agent.batch_request` entries to the Message Batches API; returns the batch id."""
+    return _get_client().messages.batches.create(requests=requests).id
+
+
+def get_batch_results(batch_id: str) -> Optional[Dict[str, str]]:
+    """custom_id -> response text once the batch has ended, None while it's still processing.
+    
+    Requests that errored or expired are left out.
+    """
+    batches = _get_client().messages.batches
+    if batches.retrieve(batch_id).processing_status != "ended":
+        return None
+    
+    results = {}
+    for entry in batches.results(batch_id):
+        if entry.result.type == "succeeded":
+            results[entry.custom_id] = _message_text(entry.result.message)
+    return results
 
 
 # =============================================================================
 # THE BUILD PATH - Each project teaches specific skills
 # =============================================================================
 
-PROJECTS = {
+@dataclass(frozen=True, slots=True)
+class ProjectSpec:
+    """One project in the build path. Frozen - the catalogue is read-only."""
+    name: str
+    what_you_build: str
+    why: str
+    ships_as: str
+    skills: Tuple[str, ...]
+    production_requirements: Tuple[str, ...]
+    time: str
+    portfolio_value: str = ""
+    interview_story: str = ""
+
+
+# Stand-in for an unknown project id so prompt builders never need a None check
+_UNKNOWN_PROJECT = ProjectSpec("Unknown", "", "", "", (), (), "")
+
+PROJECTS: Dict[str, ProjectSpec] = {
     # =========================================================================
     # FOUNDATION: Learn Python by building useful tools
     # =========================================================================
-    "01_cli_file_processor": {
-        "name": "CLI File Processor",
-        "what_you_build": "A CLI tool that processes files (JSON/CSV/text) with proper error handling",
-        "why": "Every serious project needs good CLI interfaces. Learn the foundation.",
-        "ships_as": "Installable CLI tool (pip install -e .)",
-        "skills": [
+    "01_cli_file_processor": ProjectSpec(
+        name="CLI File Processor",
+        what_you_build="A CLI tool that processes files (JSON/CSV/text) with proper error handling",
+        why="Every serious project needs good CLI interfaces. Learn the foundation.",
+        ships_as="Installable CLI tool (pip install -e .)",
+        skills=(
             "Project structure (src layout, pyproject.toml)",
             "Type hints everywhere",
             "argparse or typer for CLI",
             "pathlib for file handling",
             "Custom exceptions",
             "Logging (not print)",
-        ],
-        "production_requirements": [
+        ),
+        production_requirements=(
             "Typed with mypy passing",
             "Has --help that actually helps",
             "Graceful error messages (not tracebacks)",
             "Works on files that don't exist (helpful error)",
             "Has at least 3 tests",
-        ],
-        "time": "2-3 days",
-    },
+        ),
+        time="2-3 days",
+    ),
     
-    "02_async_data_fetcher": {
-        "name": "Async Data Fetcher",
-        "what_you_build": "Async HTTP client that fetches from multiple APIs with rate limiting",
-        "why": "LLM work = lots of API calls. Master async and HTTP.",
-        "ships_as": "Reusable library + CLI",
-        "skills": [
+    "02_async_data_fetcher": ProjectSpec(
+        name="Async Data Fetcher",
+        what_you_build="Async HTTP client that fetches from multiple APIs with rate limiting",
+        why="LLM work = lots of API calls. Master async and HTTP.",
+        ships_as="Reusable library + CLI",
+        skills=(
             "asyncio and aiohttp",
             "Rate limiting (token bucket)",
             "Retry with exponential backoff",
             "Connection pooling",
             "Progress bars (rich or tqdm)",
             "Structured logging",
-        ],
-        "production_requirements": [
+        ),
+        production_requirements=(
             "Respects rate limits (no hammering APIs)",
             "Retries transient failures",
             "Shows progress for long operations",
             "Can be cancelled cleanly (Ctrl+C)",
             "Timeout handling",
-        ],
-        "time": "3-4 days",
-    },
+        ),
+        time="3-4 days",
+    ),
     
-    "03_config_and_secrets": {
-        "name": "Config & Secrets Manager",
-        "what_you_build": "A config system with env vars, files, validation, and secrets handling",
-        "why": "Real projects need proper config. Not hardcoded API keys.",
-        "ships_as": "Reusable config library",
-        "skills": [
+    "03_config_and_secrets": ProjectSpec(
+        name="Config & Secrets Manager",
+        what_you_build="A config system with env vars, files, validation, and secrets handling",
+        why="Real projects need proper config. Not hardcoded API keys.",
+        ships_as="Reusable config library",
+        skills=(
             "Pydantic for validation",
             "Environment variables",
             "YAML/TOML config files",
             "Secrets handling (never log secrets)",
             "Config hierarchy (defaults < file < env < cli)",
             "dataclasses and __post_init__",
-        ],
-        "production_requirements": [
+        ),
+        production_requirements=(
             "Validates config on load (fail fast)",
             "Secrets never appear in logs or errors",
             "Works in Docker (env vars)",
             "Works locally (config file)",
             "Clear error messages for missing config",
-        ],
-        "time": "2-3 days",
-    },
+        ),
+        time="2-3 days",
+    ),
     
     # =========================================================================
     # LLM TOOLING: Build the tools you need for AI work
     # =========================================================================
-    "04_llm_client": {
-        "name": "Universal LLM Client",
-        "what_you_build": "A client that talks to OpenAI, Anthropic, local models with same interface",
-        "why": "Abstract away providers. Switch models without changing code.",
-        "ships_as": "Python library",
-        "skills": [
+    "04_llm_client": ProjectSpec(
+        name="Universal LLM Client",
+        what_you_build="A client that talks to OpenAI, Anthropic, local models with same interface",
+        why="Abstract away providers. Switch models without changing code.",
+        ships_as="Python library",
+        skills=(
             "ABC and Protocols (interfaces)",
             "Factory pattern",
             "Dependency injection",
             "Streaming responses",
             "Token counting",
             "Cost tracking",
-        ],
-        "production_requirements": [
+        ),
+        production_requirements=(
             "Same interface for all providers",
             "Streaming works correctly",
             "Tracks token usage and cost",
             "Handles API errors gracefully",
             "Easy to add new providers",
-        ],
-        "time": "4-5 days",
-    },
+        ),
+        time="4-5 days",
+    ),
     
-    "05_structured_outputs": {
-        "name": "Structured Output Parser",
-        "what_you_build": "Force LLMs to return valid JSON/Pydantic models with retries",
-        "why": "LLMs return garbage sometimes. Make them reliable.",
-        "ships_as": "Library that wraps LLM calls",
-        "skills": [
+    "05_structured_outputs": ProjectSpec(
+        name="Structured Output Parser",
+        what_you_build="Force LLMs to return valid JSON/Pydantic models with retries",
+        why="LLMs return garbage sometimes. Make them reliable.",
+        ships_as="Library that wraps LLM calls",
+        skills=(
             "Pydantic models for schemas",
             "JSON extraction from messy text",
             "Retry logic with validation",
             "Prompt engineering for structure",
             "Generic types (TypeVar)",
             "Decorators",
-        ],
-        "production_requirements": [
+        ),
+        production_requirements=(
             "Returns typed Pydantic models",
             "Retries on parse failure (with better prompt)",
             "Validates against schema",
             "Works with streaming",
             "Handles partial JSON",
-        ],
-        "time": "3-4 days",
-    },
+        ),
+        time="3-4 days",
+    ),
     
-    "06_prompt_manager": {
-        "name": "Prompt Template System",
-        "what_you_build": "A system for managing, versioning, and testing prompts",
-        "why": "Prompts are code. Treat them like code.",
-        "ships_as": "Library + CLI for prompt management",
-        "skills": [
+    "06_prompt_manager": ProjectSpec(
+        name="Prompt Template System",
+        what_you_build="A system for managing, versioning, and testing prompts",
+        why="Prompts are code. Treat them like code.",
+        ships_as="Library + CLI for prompt management",
+        skills=(
             "Jinja2 templating",
             "YAML-based prompt storage",
             "Version control for prompts",
             "Prompt testing framework",
             "Variable validation",
             "Context managers",
-        ],
-        "production_requirements": [
+        ),
+        production_requirements=(
             "Prompts stored as files (not hardcoded)",
             "Variables are validated before rendering",
             "Can diff prompt versions",
             "Can test prompts against expected outputs",
             "CLI to list/render/test prompts",
-        ],
-        "time": "3-4 days",
-    },
+        ),
+        time="3-4 days",
+    ),
     
     # =========================================================================
     # EVAL SYSTEMS: Build tools to measure AI quality
     # =========================================================================
-    "07_simple_eval": {
-        "name": "Simple Eval Runner",
-        "what_you_build": "Run a model against a dataset and compute metrics",
-        "why": "Can't improve what you can't measure.",
-        "ships_as": "CLI tool + library",
-        "skills": [
+    "07_simple_eval": ProjectSpec(
+        name="Simple Eval Runner",
+        what_you_build="Run a model against a dataset and compute metrics",
+        why="Can't improve what you can't measure.",
+        ships_as="CLI tool + library",
+        skills=(
             "Dataset loading (HuggingFace, JSON, CSV)",
             "Batch processing with progress",
             "Metrics computation (accuracy, F1, etc.)",
             "Results serialization",
             "Parallel execution",
             "Caching (don't re-run completed items)",
-        ],
-        "production_requirements": [
+        ),
+        production_requirements=(
             "Resumable (can stop and continue)",
             "Caches results (don't waste API calls)",
             "Outputs structured results (JSON)",
             "Shows progress and ETA",
             "Handles failures gracefully (skip, retry, or fail)",
-        ],
-        "time": "4-5 days",
-    },
+        ),
+        time="4-5 days",
+    ),
     
-    "08_llm_judge": {
-        "name": "LLM-as-Judge System",
-        "what_you_build": "Use one LLM to evaluate another LLM's outputs",
-        "why": "This is how modern evals work. MT-Bench, Chatbot Arena, etc.",
-        "ships_as": "Library + CLI",
-        "skills": [
+    "08_llm_judge": ProjectSpec(
+        name="LLM-as-Judge System",
+        what_you_build="Use one LLM to evaluate another LLM's outputs",
+        why="This is how modern evals work. MT-Bench, Chatbot Arena, etc.",
+        ships_as="Library + CLI",
+        skills=(
             "Judge prompt engineering",
             "Rubric design",
             "Pairwise comparisons",
             "Position bias mitigation",
             "Inter-rater reliability",
             "Structured judge outputs",
-        ],
-        "production_requirements": [
+        ),
+        production_requirements=(
             "Configurable rubrics",
             "Handles position bias (swap order, average)",
             "Returns structured scores + reasoning",
             "Can use different judge models",
             "Computes agreement metrics",
-        ],
-        "time": "5-6 days",
-    },
+        ),
+        time="5-6 days",
+    ),
     
-    "09_multi_agent_debate": {
-        "name": "Multi-Agent Debate System",
-        "what_you_build": "Agents that critique and improve each other's responses",
-        "why": "Self-improvement through debate. Cutting edge technique.",
-        "ships_as": "Framework + examples",
-        "skills": [
+    "09_multi_agent_debate": ProjectSpec(
+        name="Multi-Agent Debate System",
+        what_you_build="Agents that critique and improve each other's responses",
+        why="Self-improvement through debate. Cutting edge technique.",
+        ships_as="Framework + examples",
+        skills=(
             "Agent orchestration",
             "Conversation management",
             "Critique prompt design",
             "Iterative refinement",
             "Stopping conditions",
             "Logging agent interactions",
-        ],
-        "production_requirements": [
+        ),
+        production_requirements=(
             "Configurable number of rounds",
             "Different agent roles (generator, critic, judge)",
             "Full conversation logging",
             "Quality improves over rounds (measurable)",
             "Cost tracking per debate",
-        ],
-        "time": "5-6 days",
-    },
+        ),
+        time="5-6 days",
+    ),
     
     # =========================================================================
     # WEB & DEPLOYMENT: Full-stack skills for the capstone
     # =========================================================================
-    "10_fastapi_backend": {
-        "name": "FastAPI Backend",
-        "what_you_build": "A REST API that wraps your LLM client and eval tools",
-        "why": "Your capstone needs a backend. Learn FastAPI now.",
-        "ships_as": "Running API server + OpenAPI docs",
-        "skills": [
+    "10_fastapi_backend": ProjectSpec(
+        name="FastAPI Backend",
+        what_you_build="A REST API that wraps your LLM client and eval tools",
+        why="Your capstone needs a backend. Learn FastAPI now.",
+        ships_as="Running API server + OpenAPI docs",
+        skills=(
             "FastAPI basics (routes, request/response models)",
             "Pydantic for API schemas",
             "Dependency injection",
@@ -480,24 +1045,24 @@ PROJECTS = {
             "WebSockets (for streaming)",
             "CORS configuration",
             "API versioning",
-        ],
-        "production_requirements": [
+        ),
+        production_requirements=(
             "OpenAPI docs auto-generated and accurate",
             "Proper HTTP status codes",
             "Request validation with helpful errors",
             "Streaming endpoint for LLM responses",
             "Health check endpoint",
             "Structured logging with request IDs",
-        ],
-        "time": "4-5 days",
-    },
+        ),
+        time="4-5 days",
+    ),
     
-    "11_database_and_auth": {
-        "name": "Database & Auth",
-        "what_you_build": "Add persistence and user authentication to your API",
-        "why": "Multi-user apps need databases and auth. No shortcuts.",
-        "ships_as": "API with login, users, and persistent data",
-        "skills": [
+    "11_database_and_auth": ProjectSpec(
+        name="Database & Auth",
+        what_you_build="Add persistence and user authentication to your API",
+        why="Multi-user apps need databases and auth. No shortcuts.",
+        ships_as="API with login, users, and persistent data",
+        skills=(
             "SQLAlchemy or SQLModel ORM",
             "Database migrations (Alembic)",
             "User model and sessions",
@@ -505,24 +1070,24 @@ PROJECTS = {
             "JWT tokens",
             "OAuth basics (optional: GitHub login)",
             "Row-level security (users see only their data)",
-        ],
-        "production_requirements": [
+        ),
+        production_requirements=(
             "Users can register and login",
             "Passwords are hashed (never stored plain)",
             "JWT tokens with expiration",
             "Protected routes require auth",
             "Users can only access their own data",
             "Database migrations work cleanly",
-        ],
-        "time": "5-6 days",
-    },
+        ),
+        time="5-6 days",
+    ),
     
-    "12_frontend": {
-        "name": "React Frontend",
-        "what_you_build": "A web UI that talks to your FastAPI backend",
-        "why": "CLI is for devs. Real users need a UI.",
-        "ships_as": "React app connected to your API",
-        "skills": [
+    "12_frontend": ProjectSpec(
+        name="React Frontend",
+        what_you_build="A web UI that talks to your FastAPI backend",
+        why="CLI is for devs. Real users need a UI.",
+        ships_as="React app connected to your API",
+        skills=(
             "React basics (components, state, hooks)",
             "TypeScript for frontend",
             "API calls (fetch or axios)",
@@ -530,24 +1095,24 @@ PROJECTS = {
             "Forms and validation",
             "Loading states and error handling",
             "Basic styling (Tailwind or CSS modules)",
-        ],
-        "production_requirements": [
+        ),
+        production_requirements=(
             "Login/register screens that work",
             "Auth state persists across refresh",
             "Protected routes redirect to login",
             "API errors shown to user helpfully",
             "Loading spinners during API calls",
             "Mobile-responsive layout",
-        ],
-        "time": "5-6 days",
-    },
+        ),
+        time="5-6 days",
+    ),
     
-    "13_deployment": {
-        "name": "Deployment & DevOps",
-        "what_you_build": "Deploy your full-stack app to the cloud",
-        "why": "Not deployed = not real. Ship it for real.",
-        "ships_as": "Live URL anyone can access",
-        "skills": [
+    "13_deployment": ProjectSpec(
+        name="Deployment & DevOps",
+        what_you_build="Deploy your full-stack app to the cloud",
+        why="Not deployed = not real. Ship it for real.",
+        ships_as="Live URL anyone can access",
+        skills=(
             "Docker (containerize backend and frontend)",
             "Docker Compose (local multi-container)",
             "Cloud hosting (Railway, Render, or Fly.io)",
@@ -555,8 +1120,8 @@ PROJECTS = {
             "Database hosting (managed Postgres)",
             "Domain and HTTPS",
             "CI/CD basics (GitHub Actions)",
-        ],
-        "production_requirements": [
+        ),
+        production_requirements=(
             "App runs in Docker locally",
             "Deployed to cloud with real URL",
             "HTTPS enabled",
@@ -564,16 +1129,16 @@ PROJECTS = {
             "Database is hosted (not SQLite in prod)",
             "Can deploy updates with git push",
             "Has basic CI (run tests before deploy)",
-        ],
-        "time": "3-4 days",
-    },
+        ),
+        time="3-4 days",
+    ),
     
     # =========================================================================
     # CAPSTONE: The adaptive learning platform
     # =========================================================================
-    "14_capstone_adaptive_learning_platform": {
-        "name": "CAPSTONE: Adaptive Learning Platform",
-        "what_you_build": """The full OctoSodales platform - the system that taught you, rebuilt and productized:
+    "14_capstone_adaptive_learning_platform": ProjectSpec(
+        name="CAPSTONE: Adaptive Learning Platform",
+        what_you_build="""The full OctoSodales platform - the system that taught you, rebuilt and productized:
         
         ONBOARDING:
         - What's your Python level? (none / some / solid)
@@ -597,17 +1162,17 @@ PROJECTS = {
         - React frontend (from Project 12)
         - Auth & persistence (from Project 11)
         - Deployed live (from Project 13)""",
-        "why": "You learned with this system. Now you rebuild it. 'I built OctoSodales to teach me how to build OctoSodales.'",
-        "ships_as": "Deployed web app at a real URL + GitHub repo",
-        "skills": [
+        why="You learned with this system. Now you rebuild it. 'I built OctoSodales to teach me how to build OctoSodales.'",
+        ships_as="Deployed web app at a real URL + GitHub repo",
+        skills=(
             "Everything from Projects 1-13 combined",
             "Dynamic curriculum generation",
             "Multi-agent orchestration at scale",
             "Human-in-the-loop feedback systems",
             "Product thinking (onboarding UX, user journey)",
             "Full-stack integration",
-        ],
-        "production_requirements": [
+        ),
+        production_requirements=(
             "Onboarding flow asks questions and generates custom curriculum",
             "8 agents working together (4 primary + 4 coaches)",
             "Agents adapt based on learner performance",
@@ -617,13 +1182,16 @@ PROJECTS = {
             "Deployed at a real URL with HTTPS",
             "README explains the architecture and the RLHF loop",
             "Code is production quality (typed, tested, documented)",
-        ],
-        "time": "3-4 weeks",
-        "portfolio_value": "MAXIMUM - Product + RLHF system + origin story",
-        "interview_story": "I learned Python using an 8-agent AI tutor. Then I rebuilt the tutor as my capstone. It generates personalized curriculums and adapts to each learner - essentially RLHF where learner performance optimizes the teaching agents. It's deployed live and other people have used it.",
-    },
+        ),
+        time="3-4 weeks",
+        portfolio_value="MAXIMUM - Product + RLHF system + origin story",
+        interview_story="I learned Python using an 8-agent AI tutor. Then I rebuilt the tutor as my capstone. It generates personalized curriculums and adapts to each learner - essentially RLHF where learner performance optimizes the teaching agents. It's deployed live and other people have used it.",
+    ),
 }
 
+# Build order, resolved once: the CLI picks a start by number, completion moves to the next
+_PROJECT_IDS: Tuple[str, ...] = tuple(PROJECTS)
+
 # Alternative capstones if the learning platform doesn't fit their goals
 ALTERNATIVE_CAPSTONES = {
     "eval_harness": {
@@ -719,7 +1287,16 @@ VERIFY: [How to check it worked]
 
 ---
 
-EXAMPLE LESSON (custom exceptions):
+RULES:
+- SAY: 2-3 sentences, no code
+- SEE: 5-10 lines MAX, one concept
+- DO: Micro-steps with VERIFY after each
+- NEVER dump 40 lines and say "implement this"
+- NEVER skip the VERIFY step
+"""
+
+# Worked example for the Teacher - only sent until the learner has finished a task
+LECTURE_EXAMPLE = """EXAMPLE LESSON (custom exceptions):
 
 ## 📖 SAY: Custom Exceptions
 
@@ -755,15 +1332,6 @@ if not path.exists():
 VERIFY: Run your CLI with a fake file. Should see "FileProcessingError"
 
 Done when Step 2 passes.
-
----
-
-RULES:
-- SAY: 2-3 sentences, no code
-- SEE: 5-10 lines MAX, one concept
-- DO: Micro-steps with VERIFY after each
-- NEVER dump 40 lines and say "implement this"
-- NEVER skip the VERIFY step
 """
 
 CHALLENGE_PROMPT = """You are assigning BUILD challenges - small, concrete, achievable tasks.
@@ -778,13 +1346,6 @@ When you assign "build function X", it MUST include from the start:
 - Type hints
 - The happy path AND the failure path
 
-BAD (separate tasks):
-1. "Build process_file function"
-2. "Add error handling to process_file"  ← NO! This is refactoring!
-
-GOOD (integrated task):
-1. "Build process_file that reads a file, handles FileNotFoundError, and returns a result"
-
 NEVER assign tasks that require refactoring existing code. Get it right the first time.
 
 TASK SIZING:
@@ -809,6 +1370,17 @@ OUTPUT FORMAT:
 Integrated from the start. No refactoring tasks.
 """
 
+# Worked example for the Challenger - only sent until the learner has finished a task
+CHALLENGE_EXAMPLE = """EXAMPLE:
+
+BAD (separate tasks):
+1. "Build process_file function"
+2. "Add error handling to process_file"  ← NO! This is refactoring!
+
+GOOD (integrated task):
+1. "Build process_file that reads a file, handles FileNotFoundError, and returns a result"
+"""
+
 REVIEW_PROMPT = """You are a SENIOR ENGINEER doing code review.
 
 🚨 CRITICAL RULE - READ THIS FIRST:
@@ -953,247 +1525,933 @@ OUTPUT FORMAT:
 }
 """
 
+COACHING_TEAM_PROMPT = """You are the COACHING TEAM. You run all four coaches in one pass.
+
+Each section below gives one coach's brief followed by the evidence it should evaluate.
+Answer every section exactly as that coach would, independently of the other sections.
+
+OUTPUT FORMAT:
+One JSON object keyed by section name ("curriculum", "teacher", "challenger", "reviewer"),
+each value being that coach's own JSON output. Only include the sections you were given.
+"""
+
 
 # =============================================================================
-# LEARNER PROFILE
+# REQUEST TEMPLATES
 # =============================================================================
+# Static skeletons of the per-call user messages; only the learner-specific
+# slices are filled in with `.format()` on each call.
 
-@dataclass
-class BuilderProfile:
-    name: str = "Builder"
-    current_project: str = "01_cli_file_processor"
-    projects_completed: List[str] = field(default_factory=list)
-    
-    # Current project state
-    project_status: str = "not_started"  # not_started, in_progress, in_review, complete
-    current_task: str = ""
-    tasks_completed: List[str] = field(default_factory=list)
-    
-    # Code quality tracking
-    review_history: List[dict] = field(default_factory=list)
-    recurring_issues: List[str] = field(default_factory=list)
-    
-    # Time tracking
-    days_on_current_project: int = 0
-    total_days: int = 0
-    
-    # Learning preferences
-    task_size: str = "medium"  # small, medium, large
-    explanation_depth: str = "detailed"  # brief, detailed, deep-dive
-    learning_style: str = "examples"  # examples, theory-first, trial-error
-    pace: str = "normal"  # slow, normal, fast
-    
-    def get_preferences_context(self) -> str:
-        """Return preferences as context for agents."""
-        return f"""
-LEARNER PREFERENCES (adapt your style to match):
-- Task size: {self.task_size} ({"15-30 min tasks" if self.task_size == "small" else "30-60 min tasks" if self.task_size == "medium" else "1-2 hour tasks"})
-- Explanation depth: {self.explanation_depth} ({"quick and minimal" if self.explanation_depth == "brief" else "thorough with examples" if self.explanation_depth == "detailed" else "comprehensive with theory"})
-- Learning style: {self.learning_style} ({"show code first, explain after" if self.learning_style == "examples" else "explain concept, then show code" if self.learning_style == "theory-first" else "give task, let them struggle, then help"})
-- Pace: {self.pace} ({"extra scaffolding and smaller steps" if self.pace == "slow" else "standard progression" if self.pace == "normal" else "minimal hand-holding, challenge them"})
+CURRICULUM_COACH_TEMPLATE = """
+Evaluate the Curriculum Agent's recent decisions:
+{history}
+
+Learner progress:
+- Projects completed: {projects_completed}
+- Days on current project: {days}
+- Recent review verdicts: {verdicts}
+
+Output JSON with "recommendation" field containing a direct instruction for the Curriculum Agent.
 """
-    
-    def to_context(self) -> str:
-        project_info = PROJECTS.get(self.current_project, {})
-        return f"""
-BUILDER: {self.name}
 
-CURRENT PROJECT: {self.current_project}
-  {project_info.get('name', 'Unknown')}
-  Status: {self.project_status}
-  Days on project: {self.days_on_current_project}
+TEACHER_COACH_TEMPLATE = """
+Evaluate the Teacher Agent's recent lessons:
+{history}
 
-PROGRESS:
-  Projects completed: {len(self.projects_completed)}/14
-  Completed: {self.projects_completed}
+Are lessons landing?
+- Recurring issues in reviews: {recurring_issues}
+- Same mistakes repeating: {repeating}
 
-PATTERNS TO WATCH:
-  Recurring issues: {self.recurring_issues or 'None yet'}
-{self.get_preferences_context()}
-TOTAL TIME: {self.total_days} days
+Output JSON with "recommendation" field containing a direct instruction for the Teacher Agent.
 """
-    
-    def save(self):
-        """Save progress to file"""
-        data = asdict(self)
-        with open(SAVE_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        print(f"💾 Progress saved to {SAVE_FILE}")
-    
-    @classmethod
-    def load(cls) -> Optional['BuilderProfile']:
-        """Load progress from file if it exists"""
-        if not SAVE_FILE.exists():
-            return None
-        try:
-            with open(SAVE_FILE, 'r') as f:
-                data = json.load(f)
-            profile = cls(**data)
-            print(f"📂 Loaded progress for {profile.name}")
-            return profile
-        except Exception as e:
-            print(f"⚠️  Could not load save file: {e}")
-            return None
 
+CHALLENGER_COACH_TEMPLATE = """
+Evaluate the Challenger Agent's recent tasks:
+{history}
 
-# =============================================================================
-# ORCHESTRATOR
-# =============================================================================
+Task performance:
+- Tasks completed: {tasks_completed}
+- Review pass rate: {passed} / {reviewed}
 
-class BuildOrchestrator:
-    def __init__(self, use_coaching: bool = True):
-        # Primary agents
-        # Curriculum uses Opus (strategic decisions), rest use Sonnet
-        self.curriculum = Agent("Curriculum", CURRICULUM_PROMPT, use_opus=True)
-        self.teacher = Agent("Teacher", LECTURE_PROMPT, use_opus=False)
-        self.challenger = Agent("Challenger", CHALLENGE_PROMPT, use_opus=False)
-        self.reviewer = Agent("Reviewer", REVIEW_PROMPT, use_opus=False)
-        
-        # Coaching layer (meta-agents that optimize the primary agents)
-        self.use_coaching = use_coaching
-        if use_coaching:
-            # Curriculum Coach also uses Opus (meta-level strategic analysis)
-            self.curriculum_coach = Agent("CurriculumCoach", CURRICULUM_COACH_PROMPT, use_opus=True)
-            self.teacher_coach = Agent("TeacherCoach", TEACHER_COACH_PROMPT, use_opus=False)
-            self.challenger_coach = Agent("ChallengerCoach", CHALLENGER_COACH_PROMPT, use_opus=False)
-            self.reviewer_coach = Agent("ReviewerCoach", REVIEWER_COACH_PROMPT, use_opus=False)
-        
-        # Track agent outputs for coaching
-        self.agent_history = {
-            "curriculum": [],
-            "teacher": [],
-            "challenger": [],
-            "reviewer": [],
-        }
-        
-        # Auto-coaching: run every N reviews
-        self.reviews_since_coaching = 0
-        self.auto_coach_interval = 3  # Run coaching every 3 reviews
-        
-        self.learner = BuilderProfile()
-        
-        # Show model config on init
-        print("\n⚙️  MODEL CONFIG:")
-        print("   OPUS: Curriculum, Curriculum Coach")
-        print("   SONNET: Teacher, Challenger, Reviewer + their coaches")
-    
+Output JSON with "recommendation" field containing a direct instruction for the Challenger Agent.
+"""
+
+REVIEWER_COACH_TEMPLATE = """
+Evaluate the Reviewer Agent's recent reviews:
+{history}
+
+Review effectiveness:
+- Recurring issues (not being fixed): {recurring_issues}
+- Improvement trend: {trend}
+
+Output JSON with "recommendation" field containing a direct instruction for the Reviewer Agent.
+"""
+
+REPORT_ISSUE_TEMPLATE = """
+STUDENT REPORTED AN ISSUE:
+"{issue}"
+
+RECENT TEACHER OUTPUT:
+{lessons}
+
+RECENT CHALLENGER TASKS:
+{tasks}
+
+RECENT REVIEWS:
+{reviews}
+
+ANALYZE:
+1. Which agent is at fault? (Teacher, Challenger, Reviewer, or multiple)
+2. What specifically went wrong?
+3. What directive should each responsible agent receive?
+
+OUTPUT JSON:
+{{
+    "fault": ["teacher", "challenger", "reviewer"],  // which agents are responsible
+    "analysis": "What went wrong",
+    "directives": {{
+        "teacher": "Specific instruction for teacher (or null)",
+        "challenger": "Specific instruction for challenger (or null)",
+        "reviewer": "Specific instruction for reviewer (or null)"
+    }}
+}}
+"""
+
+CURRICULUM_CHECK_TEMPLATE = """
+Current project: {project_id}
+Projects completed: {projects_completed}
+Tasks completed in current project: {tasks_completed}
+Days on current project: {days}
+
+Recent review history:
+{reviews}
+
+Recurring issues: {recurring_issues}
+
+Assess their progress and recommend next steps. Output ONLY valid JSON.
+"""
+
+NEXT_TASK_TEMPLATE = """
+Current project: {project}
+Skills to learn: {skills}
+
+COMPLETED TASKS (do NOT repeat these):
+{tasks_completed}
+
+FILES THAT PASSED REVIEW (already ship_it):
+{shipped}
+
+RECURRING ISSUES to address:
+{recurring_issues}
+
+IMPORTANT: Look at the project code below. Do NOT assign tasks for things that are already built!
+If cli.py already has a working CLI (Click, Typer, or argparse), move to the NEXT thing (tests, features, etc.)
+
+Give the NEXT task that builds on what exists. Don't rebuild existing code.
+Output ONLY valid JSON, no markdown, no explanation before or after.
+"""
+
+LESSON_TEMPLATE = """
+They're building: {project}
+They need to learn: {topic}
+Their current task: {task}
+
+Teach them {topic} with production code examples they can use RIGHT NOW.
+Keep it under 500 words. They should be coding, not reading.
+"""
+
+SUBMIT_CODE_TEMPLATE = """
+PROJECT: {project}
+REQUIREMENTS: {requirements}
+
+CURRENT TASK: {task}
+
+SUBMITTED CODE:
+```python
+{code}
+```
+
+DESCRIPTION: {description}
+
+Review this code. Be direct. Output ONLY valid JSON.
+"""
+
+REVIEW_FILE_TEMPLATE = """
+PROJECT: {project}
+
+CURRENT TASK: {task}
+
+REVIEW ONLY THIS FILE (ignore everything else):
+{file_content}
+
+Review ONLY the code shown above. Does it complete the current task?
+Don't mention other files, tests, or things not related to this specific task.
+"""
+
+CHAT_TEMPLATE = """
+The learner asks: {message}
+
+Look at their code and TEACH them:
+- If they have a bug, show them EXACTLY where it is and explain WHY it's wrong
+- If they ask "how do I do X", show complete working code with explanations
+- Explain imports, type hints, syntax - don't assume they know production patterns
+- Be specific to THEIR code and THEIR current task
+
+You are a TEACHER. Actually teach. No "go read the docs" or placeholders.
+"""
+
+
+# =============================================================================
+# LEARNER PROFILE
+# =============================================================================
+
+# Descriptions for each learner preference; unknown values fall back to the last tier
+TASK_SIZE_DESC = {"small": "15-30 min tasks", "medium": "30-60 min tasks", "large": "1-2 hour tasks"}
+EXPLANATION_DEPTH_DESC = {"brief": "quick and minimal", "detailed": "thorough with examples",
+                          "deep-dive": "comprehensive with theory"}
+LEARNING_STYLE_DESC = {"examples": "show code first, explain after", "theory-first": "explain concept, then show code",
+                       "trial-error": "give task, let them struggle, then help"}
+PACE_DESC = {"slow": "extra scaffolding and smaller steps", "normal": "standard progression",
+             "fast": "minimal hand-holding, challenge them"}
+
+PREFERENCES_TEMPLATE = """
+LEARNER PREFERENCES (adapt your style to match):
+- Task size: {task_size} ({task_size_desc})
+- Explanation depth: {explanation_depth} ({explanation_depth_desc})
+- Learning style: {learning_style} ({learning_style_desc})
+- Pace: {pace} ({pace_desc})
+"""
+
+PROJECT_STATUSES = ("not_started", "in_progress", "in_review", "complete")
+
+# Enum-like profile fields and their allowed values (None: any project id)
+PROFILE_ENUMS = {
+    "current_project": None,
+    "project_status": PROJECT_STATUSES,
+    "task_size": TASK_SIZE_DESC,
+    "explanation_depth": EXPLANATION_DEPTH_DESC,
+    "learning_style": LEARNING_STYLE_DESC,
+    "pace": PACE_DESC,
+}
+
+
+@dataclass(slots=True)
+class BuilderProfile:
+    name: str = "Builder"
+    current_project: str = "01_cli_file_processor"
+    projects_completed: List[str] = field(default_factory=list)
+    
+    # Current project state
+    project_status: str = "not_started"  # not_started, in_progress, in_review, complete
+    current_task: str = ""
+    tasks_completed: List[str] = field(default_factory=list)
+    
+    # Code quality tracking
+    review_history: List[dict] = field(default_factory=list)
+    recurring_issues: List[str] = field(default_factory=list)
+    
+    # Time tracking
+    days_on_current_project: int = 0
+    total_days: int = 0
+    
+    # Learning preferences
+    task_size: str = "medium"  # small, medium, large
+    explanation_depth: str = "detailed"  # brief, detailed, deep-dive
+    learning_style: str = "examples"  # examples, theory-first, trial-error
+    pace: str = "normal"  # slow, normal, fast
+    
+    # Rendered-context caches (not persisted). Keyed on the values they render,
+    # since the list fields are mutated in place and never pass through setattr.
+    _prefs_key: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _prefs_cache: str = field(default="", init=False, repr=False, compare=False)
+    _context_key: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _context_cache: str = field(default="", init=False, repr=False, compare=False)
+    
+    # Encoded value of each field as last written to disk, so save() only logs changes
+    _persisted: Dict[str, bytes] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _saves_since_snapshot: int = field(default=0, init=False, repr=False, compare=False)
+    # Id of the snapshot on disk; each log record carries it, so load() knows which records follow it
+    _snapshot_id: str = field(default="", init=False, repr=False, compare=False)
+    _save_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    _last_write: float = field(default=0.0, init=False, repr=False, compare=False)
+    _save_pending: bool = field(default=False, init=False, repr=False, compare=False)
+    _flush_at_exit: bool = field(default=False, init=False, repr=False, compare=False)
+    
+    # Derived from review_history / recurring_issues (not persisted): kept current by add_review()
+    ship_it_count: int = field(default=0, init=False, repr=False, compare=False)
+    _recurring_set: set = field(default_factory=set, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Values loaded from JSON are fresh string objects - intern them so they
+        # share storage with the literals they're compared against
+        for name, allowed in PROFILE_ENUMS.items():
+            value = getattr(self, name)
+            if not isinstance(value, str):
+                # e.g. "pace": null in a hand-edited save - the default beats losing the profile
+                default = self.__dataclass_fields__[name].default
+                log.warning("%s %r in profile is not a string - using %r", name, value, default)
+                value = default
+            value = sys.intern(value)
+            if allowed is not None and value not in allowed:
+                # Kept rather than rejected: failing here would discard the whole save
+                log.warning("Unknown %s %r in profile", name, value)
+            setattr(self, name, value)
+        self.ship_it_count = sum(1 for r in self.review_history if r.get("verdict") == "ship_it")
+        self._recurring_set = set(self.recurring_issues)
+    
+    def add_review(self, review: dict):
+        """Record a review, keeping the pass count and recurring issues in step with the history."""
+        self.review_history.append(review)
+        if review.get("verdict") == "ship_it":
+            self.ship_it_count += 1
+        
+        # The list keeps first-seen order for the prompts; the set answers "seen before?"
+        for issue in review.get("must_fix", []):
+            if isinstance(issue, str) and issue not in self._recurring_set:
+                self._recurring_set.add(issue)
+                self.recurring_issues.append(issue)
+    
+    def get_preferences_context(self) -> str:
+        """Return preferences as context for agents."""
+        key = (self.task_size, self.explanation_depth, self.learning_style, self.pace)
+        if key != self._prefs_key:
+            self._prefs_cache = PREFERENCES_TEMPLATE.format(
+                task_size=self.task_size,
+                task_size_desc=TASK_SIZE_DESC.get(self.task_size, TASK_SIZE_DESC["large"]),
+                explanation_depth=self.explanation_depth,
+                explanation_depth_desc=EXPLANATION_DEPTH_DESC.get(self.explanation_depth, EXPLANATION_DEPTH_DESC["deep-dive"]),
+                learning_style=self.learning_style,
+                learning_style_desc=LEARNING_STYLE_DESC.get(self.learning_style, LEARNING_STYLE_DESC["trial-error"]),
+                pace=self.pace,
+                pace_desc=PACE_DESC.get(self.pace, PACE_DESC["fast"]),
+            )
+            self._prefs_key = key
+        return self._prefs_cache
+    
+    def to_context(self) -> str:
+        # Every agent call renders this, usually several times per turn with no changes
+        key = (
+            self.name, self.current_project, self.project_status, self.days_on_current_project,
+            self.total_days, tuple(self.projects_completed), tuple(self.recurring_issues),
+            self.task_size, self.explanation_depth, self.learning_style, self.pace,
+        )
+        if key == self._context_key:
+            return self._context_cache
+        project_info = PROJECTS.get(self.current_project, _UNKNOWN_PROJECT)
+        self._context_cache = f"""
+BUILDER: {self.name}
+
+CURRENT PROJECT: {self.current_project}
+  {project_info.name}
+  Status: {self.project_status}
+  Days on project: {self.days_on_current_project}
+
+PROGRESS:
+  Projects completed: {len(self.projects_completed)}/14
+  Completed: {self.projects_completed}
+
+PATTERNS TO WATCH:
+  Recurring issues: {self.recurring_issues or 'None yet'}
+{self.get_preferences_context()}
+TOTAL TIME: {self.total_days} days
+"""
+        self._context_key = key
+        return self._context_cache
+    
+    def to_dict(self) -> dict:
+        """Persisted fields only - the render caches and save bookkeeping stay out.
+        
+        A shallow, flat copy: unlike `asdict` it doesn't deep-copy review_history,
+        and the JSON encoder walks the nested lists itself.
+        """
+        return {name: getattr(self, name) for name in _PROFILE_FIELDS}
+    
+    def save(self):
+        """Save progress to file.
+        
+        Bursts of saves are coalesced: one made within SAVE_DEBOUNCE of the last
+        write is deferred to the next save, an explicit `flush`, or exit.
+        """
+        if time.monotonic() - self._last_write >= SAVE_DEBOUNCE:
+            self.flush()
+            return
+        self._save_pending = True
+        if not self._flush_at_exit:
+            atexit.register(self._flush_pending)
+            self._flush_at_exit = True
+    
+    def flush(self, quiet: bool = False):
+        """Write progress now, however recently it was last saved.
+        
+        `quiet` drops the "saved" status line to DEBUG, for callers that
+        confirm the save themselves.
+        """
+        self._save_pending = False
+        self._write(self._encode(), quiet)
+    
+    def _flush_pending(self):
+        if self._save_pending:
+            self.flush()
+    
+    def _encode(self) -> Dict[str, bytes]:
+        # Each field is encoded exactly once; the same bytes drive change
+        # detection and are spliced straight into whatever gets written
+        return {k: _json_compact(v) for k, v in self.to_dict().items()}
+    
+    def _write(self, encoded: Dict[str, bytes], quiet: bool = False):
+        # One writer at a time: the exit-time flush could otherwise race a
+        # save on the snapshot rename and on _persisted
+        with self._save_lock:
+            if encoded == self._persisted:
+                # Nothing changed since the last write (a preferences pass with every
+                # answer left blank, say): no snapshot, no log record, no disk I/O
+                log.debug("Profile unchanged - nothing to save")
+                return
+            self._write_locked(encoded)
+            self._last_write = time.monotonic()
+        log.log(logging.DEBUG if quiet else logging.INFO, "💾 Progress saved to %s", SAVE_FILE)
+    
+    def _write_locked(self, encoded: Dict[str, bytes]):
+        if not self._persisted or self._saves_since_snapshot >= SNAPSHOT_EVERY:
+            # Full snapshot: write a temp file then rename over the old save, so a
+            # crash mid-write can never leave a truncated progress file behind.
+            # Log records stamped with an older snapshot's id are ignored by
+            # load(), so a crash before the log is removed is harmless too.
+            self._snapshot_id = os.urandom(8).hex()
+            tmp = SAVE_FILE.with_suffix('.tmp')
+            tmp.write_bytes(_json_object({**encoded, "_snapshot": _json_compact(self._snapshot_id)}, b",\n") + b"\n")
+            os.replace(tmp, SAVE_FILE)
+            SAVE_LOG.unlink(missing_ok=True)
+            self._saves_since_snapshot = 0
+        else:
+            # Append only the fields that changed since the last write
+            delta = {k: v for k, v in encoded.items() if v != self._persisted.get(k)}
+            if delta:
+                record = b'{"snapshot":"%s","delta":%s}\n' % (self._snapshot_id.encode(), _json_object(delta))
+                fd = os.open(SAVE_LOG, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, record)
+                finally:
+                    os.close(fd)
+                self._saves_since_snapshot += 1
+        
+        self._persisted = encoded
+    
+    @classmethod
+    def load(cls) -> Optional['BuilderProfile']:
+        """Load progress from file if it exists"""
+        try:
+            # Read and handle FileNotFoundError rather than checking exists() first:
+            # one syscall fewer, and no window for the file to vanish in between
+            try:
+                snapshot = SAVE_FILE.read_bytes()
+            except FileNotFoundError:
+                snapshot = None
+            try:
+                changes = SAVE_LOG.read_bytes()
+            except FileNotFoundError:
+                changes = None
+            if snapshot is None and changes is None:
+                return None
+            
+            data = _json_loads(snapshot) if snapshot is not None else {}
+            # Matched by id rather than by timestamp: file mtimes and the wall
+            # clock can disagree (synced home dirs, NTP steps)
+            snapshot_id = data.pop("_snapshot", None)
+            
+            # Replay the change log written since the snapshot
+            replayed = 0
+            for line in (changes or b"").splitlines():
+                try:
+                    record = _json_loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line from a crash mid-append
+                if snapshot is None or record.get("snapshot") == snapshot_id:
+                    data.update(record["delta"])
+                    replayed += 1
+            
+            profile = cls(**data)
+            profile._snapshot_id = snapshot_id or ""
+            profile._persisted = {k: _json_compact(v) for k, v in profile.to_dict().items()}
+            # A save with no snapshot id (written before ids existed) has nothing for
+            # log records to point at, so the next write has to be a full snapshot
+            profile._saves_since_snapshot = replayed if snapshot_id is not None else SNAPSHOT_EVERY
+            log.info("📂 Loaded progress for %s", profile.name)
+            return profile
+        except Exception as e:
+            log.warning("⚠️  Could not load save file: %s", e)
+            return None
+
+
+# Persisted BuilderProfile fields, resolved once instead of on every save
+_PROFILE_FIELDS = tuple(f.name for f in fields(BuilderProfile) if f.init)
+
+
+# =============================================================================
+# AGENT RESPONSE SHAPES - the OUTPUT FORMAT each JSON agent is asked for
+# =============================================================================
+
+# All keys are required: as tool schemas these tell the API what the reply must contain
+
+class CurriculumResponse(TypedDict):
+    current_project: str
+    status: Literal["in_progress", "needs_improvement", "ready_to_ship"]
+    next_action: str
+    blockers: List[str]
+    time_estimate: str
+    motivation: str
+
+
+class TaskResponse(TypedDict):
+    task: str
+    context: str
+    includes: List[str]
+    acceptance_criteria: List[str]
+    estimated_time: str
+
+
+class ReviewResponse(TypedDict):
+    verdict: Literal["ship_it", "needs_work", "major_issues"]
+    task_reviewed: str
+    works: bool
+    typed: bool
+    clean: bool
+    robust: bool
+    start_here: str
+    must_fix: List[str]
+    should_fix: List[str]
+    overall: str
+
+REVIEW_VERDICTS = get_args(ReviewResponse.__annotations__["verdict"])
+REVIEW_VERDICT_ICONS = {"ship_it": "✅", "needs_work": "⚠️", "major_issues": "❌"}
+
+
+# Parses one JSON value at an offset and reports where it ended, in C
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _extract_json(text: str) -> Optional[dict]:
+    """The first JSON object in an LLM reply, or None.
+    
+    Tries each top-level "{" in turn with `raw_decode`, which parses a single
+    value and ignores whatever follows it (closing fence, trailing prose).
+    Scanning starts at a ```json fence when there is one. A "{" that doesn't
+    parse is skipped along with everything inside it - an object nested in a
+    cut-off reply is not the reply - and one that never closes ends the search.
+    """
+    fence = text.find("```json")
+    start = text.find("{", fence if fence != -1 else 0)
+    while start != -1:
+        try:
+            data, _ = _JSON_DECODER.raw_decode(text, start)
+        except json.JSONDecodeError:
+            end = _object_end(text, start)
+            if end == -1:
+                return None  # Truncated: runs to the end of the reply
+            start = text.find("{", end)
+            continue
+        return data  # Decoding from "{" can only produce a dict
+    return None
+
+
+def _object_end(text: str, start: int) -> int:
+    """Index just past the "}" closing the "{" at `start`, or -1 if it never closes."""
+    depth = 0
+    in_string = escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return -1
+
+
+# One compiled validator per shape, built on first use. pydantic is already
+# installed alongside anthropic, but importing it costs startup time.
+_ADAPTERS: dict = {}
+
+
+_SCHEMAS: dict = {}
+
+
+def _adapter(schema: type):
+    """The pydantic TypeAdapter for a response shape, or None without pydantic."""
+    adapter = _ADAPTERS.get(schema)
+    if adapter is None:
+        try:
+            from pydantic import TypeAdapter
+        except ImportError:
+            return None
+        adapter = _ADAPTERS[schema] = TypeAdapter(schema)
+    return adapter
+
+
+def _json_schema(schema: type) -> Optional[dict]:
+    """JSON schema for a response shape, generated once per shape."""
+    if schema not in _SCHEMAS:
+        adapter = _adapter(schema)
+        _SCHEMAS[schema] = adapter.json_schema() if adapter is not None else None
+    return _SCHEMAS[schema]
+
+
+def _validate_response(schema: type, data: dict) -> dict:
+    """Coerce parsed agent JSON to `schema` with pydantic's lax mode (e.g. "true" -> True).
+    
+    Keys outside the schema are preserved. Output that doesn't fit is returned
+    unchanged - callers already cope with missing or odd fields.
+    """
+    adapter = _adapter(schema)
+    if adapter is None:
+        return data
+    try:
+        return {**data, **adapter.validate_python(data)}
+    except ValueError as e:  # pydantic's ValidationError subclasses ValueError
+        log.debug("%s did not match %s: %s", data, schema.__name__, e)
+        return data
+
+
+# =============================================================================
+# ORCHESTRATOR
+# =============================================================================
+
+_COACH_ATTRS = ("curriculum_coach", "teacher_coach", "challenger_coach", "reviewer_coach", "coaching_team")
+
+
+class BuildOrchestrator:
+    def __init__(self, use_coaching: bool = True):
+        # Primary agents
+        # Curriculum uses Opus (strategic decisions), rest use Sonnet.
+        # Output caps follow the format: the Teacher writes long Markdown lessons and
+        # chats, the others answer with one JSON object (reviews carry the most lists).
+        # The JSON agents answer through a schema-constrained tool call (response_type).
+        self.curriculum = Agent("Curriculum", CURRICULUM_PROMPT, use_opus=True, max_tokens=1500,
+                                response_type=CurriculumResponse)
+        self.teacher = Agent("Teacher", LECTURE_PROMPT, use_opus=False, example=LECTURE_EXAMPLE, cache_responses=True)
+        self.challenger = Agent("Challenger", CHALLENGE_PROMPT, use_opus=False, example=CHALLENGE_EXAMPLE, max_tokens=1500,
+                                response_type=TaskResponse)
+        # Reviews are judgements, not prose: temperature 0 keeps the verdict for the same code stable
+        self.reviewer = Agent("Reviewer", REVIEW_PROMPT, use_opus=False, max_tokens=2500, temperature=0.0,
+                              response_type=ReviewResponse)
+        # Primary agents by the name coaches and reports use for them
+        self._agent_map = {
+            "curriculum": self.curriculum,
+            "teacher": self.teacher,
+            "challenger": self.challenger,
+            "reviewer": self.reviewer,
+        }
+        
+        # Coaching layer (meta-agents that optimize the primary agents)
+        self.use_coaching = use_coaching
+        # One Opus call answering for all four coaches: fewer round trips and the
+        # shared context is paid for once, at the cost of one failure losing the round
+        self.combined_coaching = use_coaching and os.getenv("OCTO_COMBINED_COACHING") == "1"
+        
+        # Track agent outputs for coaching (last 5 each; older ones fall off the left)
+        self.agent_history: Dict[str, deque] = {
+            agent_name: deque(maxlen=5) for agent_name in ("curriculum", "teacher", "challenger", "reviewer")
+        }
+        
+        # Coaching round submitted through the Batches API, if any
+        self.pending_coaching_batch: Optional[str] = None
+        # The evidence that batch was built from and the coaches it asked; recorded
+        # as the last round only once every one of them has come back
+        self._pending_batch_signal: Optional[bytes] = None
+        self._pending_batch_coaches: Tuple[str, ...] = ()
+        
+        # What the last coaching round saw and said, so an unchanged round can be skipped
+        self.last_coaching_signal: Optional[bytes] = None
+        self.last_coaching_feedback: dict = {}
+        
+        # Auto-coaching: run every N reviews
+        self.reviews_since_coaching = 0
+        self.auto_coach_interval = 3  # Run coaching every 3 reviews
+        # Outputs an agent needs before its coach has a pattern (not an anecdote) to judge
+        self.coach_min_history = {"curriculum": 2, "teacher": 2, "challenger": 2, "reviewer": 2}
+        # Send auto-coaching rounds through the Batches API (half price, applied
+        # on a later review once the batch finishes) instead of blocking on them
+        self.batch_auto_coaching = os.getenv("OCTO_BATCH_COACHING") == "1"
+        
+        self.learner = BuilderProfile()
+        
+        # Spec of the learner's current project, looked up again only when it changes
+        self._current_proj_id = ""
+        self._current_proj = _UNKNOWN_PROJECT
+        
+        # Show model config on init
+        print("\n⚙️  MODEL CONFIG:")
+        print("   OPUS: Curriculum, Curriculum Coach")
+        print("   SONNET: Teacher, Challenger, Reviewer + their coaches")
+    
+    # The coach agents are built on first use, so sessions that never run a
+    # coaching round (or never use a given coach) don't construct them.
+    # Curriculum Coach also uses Opus (meta-level strategic analysis).
+    # A coach asked again before any new agent output gets an identical
+    # request, so those answers are reused instead of re-bought.
+    
+    @functools.cached_property
+    def curriculum_coach(self) -> Agent:
+        return Agent("CurriculumCoach", CURRICULUM_COACH_PROMPT, use_opus=True, max_tokens=1500, cache_responses=True)
+    
+    @functools.cached_property
+    def teacher_coach(self) -> Agent:
+        return Agent("TeacherCoach", TEACHER_COACH_PROMPT, use_opus=False, max_tokens=1500, cache_responses=True)
+    
+    @functools.cached_property
+    def challenger_coach(self) -> Agent:
+        return Agent("ChallengerCoach", CHALLENGER_COACH_PROMPT, use_opus=False, max_tokens=1500, cache_responses=True)
+    
+    @functools.cached_property
+    def reviewer_coach(self) -> Agent:
+        return Agent("ReviewerCoach", REVIEWER_COACH_PROMPT, use_opus=False, max_tokens=1500, cache_responses=True)
+    
+    @functools.cached_property
+    def coaching_team(self) -> Agent:
+        return Agent("CoachingTeam", COACHING_TEAM_PROMPT, use_opus=True, max_tokens=4000, cache_responses=True)
+    
+    def usage_report(self) -> str:
+        """Token usage per agent this session, with each agent's prompt-cache hit rate."""
+        agents = [self.curriculum, self.teacher, self.challenger, self.reviewer]
+        # Only coaches that were actually built - reading the property would construct one
+        agents += [vars(self)[name] for name in _COACH_ATTRS if name in vars(self)]
+        
+        lines = []
+        for agent in agents:
+            u = agent.usage
+            if not u["calls"]:
+                continue
+            prompt_tokens = u["input"] + u["cache_read"] + u["cache_write"]
+            hit_rate = u["cache_read"] / prompt_tokens if prompt_tokens else 0.0
+            lines.append(
+                f"  {agent.name:<16} {u['calls']:>3} calls  prompt {prompt_tokens:>9,}  "
+                f"cached {hit_rate:>4.0%}  output {u['output']:>8,}"
+            )
+        return "\n".join(lines) or "No API calls yet this session."
+    
+    def _project(self) -> ProjectSpec:
+        """The learner's current project spec.
+        
+        Keyed on the project id rather than reset on switches, since a resumed
+        profile replaces `self.learner` wholesale.
+        """
+        project_id = self.learner.current_project
+        if project_id != self._current_proj_id:
+            self._current_proj_id = project_id
+            self._current_proj = PROJECTS.get(project_id, _UNKNOWN_PROJECT)
+        return self._current_proj
+    
     def initialize(self, name: str, start_project: str = "01_cli_file_processor"):
         self.learner.name = name
         self.learner.current_project = start_project
     
-    def _track_output(self, agent_name: str, output: str):
-        """Track agent outputs for coaching"""
+    def _track_output(self, agent_name: str, output: str, parsed: Optional[dict] = None):
+        """Track agent outputs for coaching.
+        
+        A structured reply is kept as canonical JSON (sorted keys) rather than as
+        sent, so the same content always reaches the coach prompts - and their
+        prompt-cache prefix and response-cache key - byte for byte identical.
+        """
+        if parsed is not None and "raw" not in parsed:
+            output = _json_canonical(parsed)
         self.agent_history[agent_name].append(output)
-        # Keep last 5
-        if len(self.agent_history[agent_name]) > 5:
-            self.agent_history[agent_name] = self.agent_history[agent_name][-5:]
     
     def get_coaching_feedback(self) -> dict:
         """Get feedback from all coaches and APPLY it to agents."""
+        # Runs on the shared background loop rather than asyncio.run(), which would
+        # strand the async client's pooled connections on a loop it then closes
+        return _run_async(self.get_coaching_feedback_async())
+    
+    async def get_coaching_feedback_async(self) -> dict:
+        """The coaching round itself; must run on the shared background loop, like `Agent.arun`."""
         if not self.use_coaching:
             return {"message": "Coaching not enabled"}
         
+        prompts = self._coaching_prompts()
+        if not prompts:
+            print("   ↩️  Not enough agent output yet for the coaches to judge.")
+            return {}
+        signal = self._coaching_signal(prompts)
+        if signal == self.last_coaching_signal:
+            # Same evidence as last round: the directives it produced are still applied
+            print("   ↩️  Nothing new since the last coaching round - keeping current directives.")
+            return self.last_coaching_feedback
+        
+        if self.combined_coaching:
+            results = await self._combined_coaching(prompts)
+        else:
+            # The coaches only share the learner snapshot, so they all run at once;
+            # directives are applied afterwards so no coach sees another's half-applied advice
+            results = await gather_agents([
+                (getattr(self, f"{agent_name}_coach"), prompt, self.learner)
+                for agent_name, prompt in prompts.items()
+            ])
+        
         feedback = {}
+        for agent_name, result in zip(prompts, results):
+            if isinstance(result, BaseException):
+                print(f"   ⚠️ {agent_name.upper()} coach failed: {result!r}")
+                continue
+            feedback[agent_name] = result
+            self._apply_coaching(agent_name, result)
+        
+        if len(feedback) == len(prompts):  # A failed coach gets retried on the same evidence
+            self.last_coaching_signal, self.last_coaching_feedback = signal, feedback
+        return feedback
+    
+    async def _combined_coaching(self, prompts: Dict[str, str]) -> list:
+        """Ask the coaching team for every coach's output in one call.
+        
+        Returns one entry per prompt, in order - the coach's JSON as text, or an
+        exception for a section the reply left out - matching `gather_agents`.
+        """
+        sections = "\n\n".join(
+            f"=== {agent_name.upper()} ===\n"
+            f"COACH BRIEF:\n{getattr(self, f'{agent_name}_coach').system_prompt}\n"
+            f"EVIDENCE:\n{prompt}"
+            for agent_name, prompt in prompts.items()
+        )
+        try:
+            reply = await self.coaching_team.arun(sections, self.learner)
+        except Exception as e:
+            return [e] * len(prompts)
+        
+        data = _extract_json(reply) or {}
+        return [
+            _json_compact(data[agent_name]).decode() if isinstance(data.get(agent_name), dict)
+            else ValueError("missing from the coaching team's reply")
+            for agent_name in prompts
+        ]
+    
+    def _recent(self, agent_name: str, n: int) -> list:
+        """The agent's last `n` tracked outputs (deques don't slice)."""
+        history = self.agent_history[agent_name]
+        return list(itertools.islice(history, max(len(history) - n, 0), None))
+    
+    def _coaching_signal(self, prompts: Dict[str, str]) -> bytes:
+        """Digest of everything the coaches react to: recent agent outputs and learner patterns."""
+        evidence = [prompts, self.learner.recurring_issues, self.learner.review_history[-5:],
+                    self.learner.pace, self.learner.task_size]
+        return hashlib.blake2b(_json_compact(evidence), digest_size=16).digest()
+    
+    def queue_coaching_batch(self) -> str:
+        """Submit a coaching round through the Message Batches API.
+        
+        Half the price of the interactive calls, but results can take minutes (or
+        hours) - collect them later with `collect_coaching_batch`.
+        """
+        prompts = self._coaching_prompts()
+        if not prompts:
+            return "Nothing for the coaches to evaluate yet."
+        signal = self._coaching_signal(prompts)
+        if signal == self.last_coaching_signal:
+            return "Nothing new since the last coaching round - no batch needed."
+        
+        requests = [
+            getattr(self, f"{agent_name}_coach").batch_request(agent_name, prompt, self.learner)
+            for agent_name, prompt in prompts.items()
+        ]
+        self.pending_coaching_batch = submit_batch(requests)
+        self._pending_batch_signal, self._pending_batch_coaches = signal, tuple(prompts)
+        return f"📬 Coaching batch queued ({len(requests)} coaches): {self.pending_coaching_batch}"
+    
+    def collect_coaching_batch(self) -> Optional[dict]:
+        """Apply a finished coaching batch. Returns None while it's still processing."""
+        if not self.pending_coaching_batch:
+            return None
+        
+        feedback = get_batch_results(self.pending_coaching_batch)
+        if feedback is None:
+            return None
+        
+        self.pending_coaching_batch = None
+        for agent_name, coach_output in feedback.items():
+            self._apply_coaching(agent_name, coach_output)
+        
+        missing = [agent_name for agent_name in self._pending_batch_coaches if agent_name not in feedback]
+        for agent_name in missing:
+            print(f"   ⚠️ {agent_name.upper()} coach errored or expired in the batch")
+        if missing:
+            self.last_coaching_signal = None  # A failed coach gets retried on the same evidence
+        else:
+            self.last_coaching_signal, self.last_coaching_feedback = self._pending_batch_signal, feedback
+        self._pending_batch_signal, self._pending_batch_coaches = None, ()
+        return feedback
+    
+    def _coaching_prompts(self) -> Dict[str, str]:
+        """Build each coach's evaluation prompt, keyed by the agent it coaches."""
+        prompts = {}
+        
+        learner = self.learner
+        # Review projections shared by several coaches, sliced once per round
+        recent_reviews = learner.review_history[-5:]
+        recurring = learner.recurring_issues
+        
+        def ready(agent_name: str) -> bool:
+            return len(self.agent_history[agent_name]) >= self.coach_min_history[agent_name]
         
         # Curriculum Coach
-        if self.agent_history["curriculum"]:
-            prompt = f"""
-Evaluate the Curriculum Agent's recent decisions:
-{json.dumps(self.agent_history['curriculum'][-3:], indent=2)}
-
-Learner progress:
-- Projects completed: {self.learner.projects_completed}
-- Days on current project: {self.learner.days_on_current_project}
-- Recent review verdicts: {[r.get('verdict') for r in self.learner.review_history[-5:]]}
-
-Output JSON with "recommendation" field containing a direct instruction for the Curriculum Agent.
-"""
-            feedback["curriculum"] = self.curriculum_coach.run(prompt, self.learner)
-            self._apply_coaching("curriculum", feedback["curriculum"])
+        if ready("curriculum"):
+            prompts["curriculum"] = CURRICULUM_COACH_TEMPLATE.format(
+                history=_json_text(self._recent('curriculum', 3)),
+                projects_completed=learner.projects_completed,
+                days=learner.days_on_current_project,
+                verdicts=[r.get('verdict') for r in recent_reviews],
+            )
         
-        # Teacher Coach
-        if self.agent_history["teacher"]:
-            prompt = f"""
-Evaluate the Teacher Agent's recent lessons:
-{self.agent_history['teacher'][-2:]}
-
-Are lessons landing?
-- Recurring issues in reviews: {self.learner.recurring_issues}
-- Same mistakes repeating: {len(self.learner.recurring_issues) > 3}
-
-Output JSON with "recommendation" field containing a direct instruction for the Teacher Agent.
-"""
-            feedback["teacher"] = self.teacher_coach.run(prompt, self.learner)
-            self._apply_coaching("teacher", feedback["teacher"])
+        # Teacher Coach - judges lessons by the mistakes that keep coming back, so needs some
+        if ready("teacher") and recurring:
+            prompts["teacher"] = TEACHER_COACH_TEMPLATE.format(
+                history=self._recent('teacher', 2),
+                recurring_issues=recurring,
+                repeating=len(recurring) > 3,
+            )
         
-        # Challenger Coach  
-        if self.agent_history["challenger"]:
-            prompt = f"""
-Evaluate the Challenger Agent's recent tasks:
-{json.dumps(self.agent_history['challenger'][-3:], indent=2)}
-
-Task performance:
-- Tasks completed: {self.learner.tasks_completed}
-- Review pass rate: {len([r for r in self.learner.review_history if r.get('verdict') == 'ship_it'])} / {len(self.learner.review_history)}
-
-Output JSON with "recommendation" field containing a direct instruction for the Challenger Agent.
-"""
-            feedback["challenger"] = self.challenger_coach.run(prompt, self.learner)
-            self._apply_coaching("challenger", feedback["challenger"])
+        # Challenger Coach
+        if ready("challenger"):
+            prompts["challenger"] = CHALLENGER_COACH_TEMPLATE.format(
+                history=_json_text(self._recent('challenger', 3)),
+                tasks_completed=learner.tasks_completed,
+                passed=learner.ship_it_count,
+                reviewed=len(learner.review_history),
+            )
         
         # Reviewer Coach
-        if self.agent_history["reviewer"]:
-            prompt = f"""
-Evaluate the Reviewer Agent's recent reviews:
-{json.dumps(self.agent_history['reviewer'][-3:], indent=2)}
-
-Review effectiveness:
-- Recurring issues (not being fixed): {self.learner.recurring_issues}
-- Improvement trend: {self.learner.review_history[-3:] if len(self.learner.review_history) >= 3 else 'Not enough data'}
-
-Output JSON with "recommendation" field containing a direct instruction for the Reviewer Agent.
-"""
-            feedback["reviewer"] = self.reviewer_coach.run(prompt, self.learner)
-            self._apply_coaching("reviewer", feedback["reviewer"])
+        if ready("reviewer"):
+            prompts["reviewer"] = REVIEWER_COACH_TEMPLATE.format(
+                history=_json_text(self._recent('reviewer', 3)),
+                recurring_issues=recurring,
+                trend=recent_reviews[-3:] if len(recent_reviews) >= 3 else 'Not enough data',
+            )
         
-        return feedback
+        return prompts
     
     def _apply_coaching(self, agent_name: str, coach_output: str):
         """Extract recommendation from coach output and apply to agent."""
-        try:
-            # Try to parse JSON from the coach output
-            # Handle cases where JSON is wrapped in markdown
-            clean = coach_output
-            if "```json" in clean:
-                clean = clean.split("```json")[1].split("```")[0]
-            elif "```" in clean:
-                clean = clean.split("```")[1].split("```")[0]
-            
-            data = json.loads(clean)
+        data = _extract_json(coach_output)
+        if data is not None:
             recommendation = data.get("recommendation", "")
             
             if recommendation:
-                agent_map = {
-                    "curriculum": self.curriculum,
-                    "teacher": self.teacher,
-                    "challenger": self.challenger,
-                    "reviewer": self.reviewer,
-                }
-                if agent_name in agent_map:
-                    agent_map[agent_name].set_coaching(recommendation)
+                if agent_name in self._agent_map:
+                    self._agent_map[agent_name].set_coaching(recommendation)
                     print(f"   ✅ Applied coaching to {agent_name.upper()}")
-        except (json.JSONDecodeError, KeyError, IndexError):
+        else:
             # If we can't parse, try to extract recommendation manually
             if "recommendation" in coach_output.lower():
                 # Just use the whole output as directive
-                agent_map = {
-                    "curriculum": self.curriculum,
-                    "teacher": self.teacher,
-                    "challenger": self.challenger,
-                    "reviewer": self.reviewer,
-                }
-                if agent_name in agent_map:
-                    agent_map[agent_name].set_coaching(f"Coach feedback: {coach_output[:500]}")
+                if agent_name in self._agent_map:
+                    self._agent_map[agent_name].set_coaching(f"Coach feedback: {coach_output[:500]}")
                     print(f"   ⚠️ Applied raw coaching to {agent_name.upper()}")
     
     def report_issue(self, issue: str):
@@ -1203,222 +2461,137 @@ Output JSON with "recommendation" field containing a direct instruction for the
             return
         
         # Get recent context
-        recent_lessons = self.agent_history.get('teacher', [])[-2:]
-        recent_tasks = self.agent_history.get('challenger', [])[-2:]
-        recent_reviews = self.agent_history.get('reviewer', [])[-2:]
-        
-        prompt = f"""
-STUDENT REPORTED AN ISSUE:
-"{issue}"
-
-RECENT TEACHER OUTPUT:
-{json.dumps(recent_lessons, indent=2) if recent_lessons else 'None'}
-
-RECENT CHALLENGER TASKS:
-{json.dumps(recent_tasks, indent=2) if recent_tasks else 'None'}
-
-RECENT REVIEWS:
-{json.dumps(recent_reviews, indent=2) if recent_reviews else 'None'}
-
-ANALYZE:
-1. Which agent is at fault? (Teacher, Challenger, Reviewer, or multiple)
-2. What specifically went wrong?
-3. What directive should each responsible agent receive?
-
-OUTPUT JSON:
-{{
-    "fault": ["teacher", "challenger", "reviewer"],  // which agents are responsible
-    "analysis": "What went wrong",
-    "directives": {{
-        "teacher": "Specific instruction for teacher (or null)",
-        "challenger": "Specific instruction for challenger (or null)",
-        "reviewer": "Specific instruction for reviewer (or null)"
-    }}
-}}
-"""
+        recent_lessons = self._recent('teacher', 2)
+        recent_tasks = self._recent('challenger', 2)
+        recent_reviews = self._recent('reviewer', 2)
+        
+        prompt = REPORT_ISSUE_TEMPLATE.format(
+            issue=issue,
+            lessons=_json_text(recent_lessons) if recent_lessons else 'None',
+            tasks=_json_text(recent_tasks) if recent_tasks else 'None',
+            reviews=_json_text(recent_reviews) if recent_reviews else 'None',
+        )
         # Use curriculum coach to analyze (it has the broadest view)
         response = self.curriculum_coach.run(prompt, self.learner)
         
         try:
             # Parse and apply directives
-            clean = response
-            if "```json" in clean:
-                clean = clean.split("```json")[1].split("```")[0]
-            elif "```" in clean:
-                clean = clean.split("```")[1].split("```")[0]
-            
-            data = json.loads(clean)
+            data = _extract_json(response)
+            if data is None:
+                raise ValueError("no JSON object in coach response")
             print(f"\n📋 Analysis: {data.get('analysis', 'No analysis')}")
             print(f"   Fault: {', '.join(data.get('fault', []))}")
             
             directives = data.get('directives', {})
             for agent_name, directive in directives.items():
-                if directive:
-                    agent_map = {
-                        "teacher": self.teacher,
-                        "challenger": self.challenger,
-                        "reviewer": self.reviewer,
-                    }
-                    if agent_name in agent_map:
-                        agent_map[agent_name].set_coaching(directive)
-                        print(f"   ✅ Updated {agent_name.upper()}: {directive[:100]}...")
-        except (json.JSONDecodeError, KeyError):
+                # Reports only redirect the agents the learner works with directly
+                if directive and agent_name != "curriculum" and agent_name in self._agent_map:
+                    self._agent_map[agent_name].set_coaching(directive)
+                    print(f"   ✅ Updated {agent_name.upper()}: {directive[:100]}...")
+        except (ValueError, KeyError):
             print(f"   ⚠️ Could not parse coach response, applying general feedback")
             # Apply issue as general directive to all agents
             self.teacher.set_coaching(f"Student reported issue: {issue}")
             self.challenger.set_coaching(f"Student reported issue: {issue}")
     
-    def get_project_brief(self) -> dict:
+    def get_project_brief(self) -> Optional[ProjectSpec]:
         """Get the current project details"""
-        return PROJECTS.get(self.learner.current_project, {})
+        proj = self._project()
+        return None if proj is _UNKNOWN_PROJECT else proj
     
     def get_curriculum_check(self) -> dict:
         """Have curriculum agent evaluate progress and suggest adjustments"""
-        prompt = f"""
-Current project: {self.learner.current_project}
-Projects completed: {self.learner.projects_completed}
-Tasks completed in current project: {self.learner.tasks_completed}
-Days on current project: {self.learner.days_on_current_project}
-
-Recent review history:
-{json.dumps([{'verdict': r.get('verdict'), 'must_fix': r.get('must_fix', [])} for r in self.learner.review_history[-5:] if isinstance(r, dict)], indent=2)}
-
-Recurring issues: {self.learner.recurring_issues}
-
-Assess their progress and recommend next steps. Output ONLY valid JSON.
-"""
+        learner = self.learner
+        prompt = CURRICULUM_CHECK_TEMPLATE.format(
+            project_id=learner.current_project,
+            projects_completed=learner.projects_completed,
+            tasks_completed=learner.tasks_completed,
+            days=learner.days_on_current_project,
+            reviews=_json_text([{'verdict': r.get('verdict'), 'must_fix': r.get('must_fix', [])}
+                                for r in learner.review_history[-5:] if isinstance(r, dict)]),
+            recurring_issues=learner.recurring_issues,
+        )
         response = self.curriculum.run(prompt, self.learner)
-        self._track_output("curriculum", response)
-        
-        return self._parse_json_response(response)
+        check = self._parse_json_response(response, CurriculumResponse)
+        self._track_output("curriculum", response, check)
+        return check
     
     def get_next_task(self) -> dict:
         """Get the next task to work on - Challenger sees existing code"""
-        proj = PROJECTS.get(self.learner.current_project, {})
-        
-        prompt = f"""
-Current project: {proj.get('name')}
-Skills to learn: {proj.get('skills')}
-
-COMPLETED TASKS (do NOT repeat these):
-{self.learner.tasks_completed if self.learner.tasks_completed else 'None yet'}
-
-FILES THAT PASSED REVIEW (already ship_it):
-{[r.get('task_reviewed', 'unknown') for r in self.learner.review_history if isinstance(r, dict) and r.get('verdict') == 'ship_it']}
-
-RECURRING ISSUES to address:
-{self.learner.recurring_issues if self.learner.recurring_issues else 'None yet'}
-
-IMPORTANT: Look at the project code below. Do NOT assign tasks for things that are already built!
-If cli.py already has a working CLI (Click, Typer, or argparse), move to the NEXT thing (tests, features, etc.)
-
-Give the NEXT task that builds on what exists. Don't rebuild existing code.
-Output ONLY valid JSON, no markdown, no explanation before or after.
-"""
+        proj = self._project()
+        
+        learner = self.learner
+        prompt = NEXT_TASK_TEMPLATE.format(
+            project=proj.name,
+            skills=list(proj.skills),
+            tasks_completed=learner.tasks_completed if learner.tasks_completed else 'None yet',
+            shipped=[r.get('task_reviewed', 'unknown') for r in learner.review_history
+                     if isinstance(r, dict) and r.get('verdict') == 'ship_it'],
+            recurring_issues=learner.recurring_issues if learner.recurring_issues else 'None yet',
+        )
         # Pass include_code=True so Challenger can see what's already built
         response = self.challenger.run(prompt, self.learner, include_code=True)
-        self._track_output("challenger", response)
         
         # Parse JSON - handle markdown wrapping
-        task = self._parse_json_response(response)
+        task = self._parse_json_response(response, TaskResponse)
+        self._track_output("challenger", response, task)
         if task and "task" in task:
             self.learner.current_task = task.get("task", "")
         return task
     
-    def _parse_json_response(self, response: str) -> dict:
+    def _verdict_preview(self) -> Callable[[dict], None]:
+        """`on_partial` hook announcing a review's verdict as soon as it has streamed in."""
+        shown = False
+        
+        def preview(snapshot: dict):
+            nonlocal shown
+            verdict = snapshot.get("verdict")
+            if not shown and verdict in REVIEW_VERDICTS:
+                shown = True
+                print(f"   {REVIEW_VERDICT_ICONS[verdict]} Verdict: {verdict} (details coming...)")
+        return preview
+    
+    def _parse_json_response(self, response: str, schema: Optional[type] = None) -> dict:
         """Parse JSON from response, handling markdown code blocks."""
-        
-        # FIRST: Try extracting from markdown code block (most common case)
-        if "```json" in response:
-            try:
-                json_str = response.split("```json")[1].split("```")[0].strip()
-                return json.loads(json_str)
-            except (IndexError, json.JSONDecodeError):
-                pass
-        
-        if "```" in response:
-            try:
-                json_str = response.split("```")[1].split("```")[0].strip()
-                return json.loads(json_str)
-            except (IndexError, json.JSONDecodeError):
-                pass
-        
-        # SECOND: Try direct parse (clean JSON)
-        try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            pass
-        
-        # THIRD: Find the LAST complete JSON object (skip any { in preamble)
-        # Look for the pattern that starts a JSON object with common keys
-        for key in ['"task"', '"verdict"', '"pacing"']:
-            if key in response:
-                try:
-                    # Find the { before this key
-                    key_pos = response.find(key)
-                    start = response.rfind("{", 0, key_pos)
-                    if start != -1:
-                        # Find matching closing brace
-                        depth = 0
-                        for i, char in enumerate(response[start:], start):
-                            if char == "{":
-                                depth += 1
-                            elif char == "}":
-                                depth -= 1
-                                if depth == 0:
-                                    return json.loads(response[start:i+1])
-                except (json.JSONDecodeError, ValueError):
-                    pass
-        
-        return {"raw": response}
+        data = _extract_json(response)
+        if data is None:
+            return {"raw": response}
+        if schema is not None:
+            data = _validate_response(schema, data)
+        return data
     
     def get_lesson(self, topic: str) -> str:
         """Get a focused lesson on a specific topic"""
-        project = PROJECTS.get(self.learner.current_project, {})
-        
-        prompt = f"""
-They're building: {project.get('name')}
-They need to learn: {topic}
-Their current task: {self.learner.current_task}
-
-Teach them {topic} with production code examples they can use RIGHT NOW.
-Keep it under 500 words. They should be coding, not reading.
-"""
-        response = self.teacher.run(prompt, self.learner)
-        self._track_output("teacher", response)
-        return response
+        return "".join(self.stream_lesson(topic))
+    
+    def stream_lesson(self, topic: str) -> Iterator[str]:
+        """`get_lesson`, yielding the text as it's generated so it can be shown immediately."""
+        project = self._project()
+        
+        prompt = LESSON_TEMPLATE.format(project=project.name, topic=topic, task=self.learner.current_task)
+        parts = []
+        for text in self.teacher.stream(prompt, self.learner):
+            parts.append(text)
+            yield text
+        self._track_output("teacher", "".join(parts))
     
     def submit_code(self, code: str, description: str = "") -> dict:
         """Submit code for review (manual paste - legacy)"""
-        proj = PROJECTS.get(self.learner.current_project, {})
-        
-        prompt = f"""
-PROJECT: {proj.get('name')}
-REQUIREMENTS: {proj.get('production_requirements')}
-
-CURRENT TASK: {self.learner.current_task}
-
-SUBMITTED CODE:
-```python
-{code}
-```
-
-DESCRIPTION: {description}
-
-Review this code. Be direct. Output ONLY valid JSON.
-"""
-        response = self.reviewer.run(prompt, self.learner)
-        self._track_output("reviewer", response)
-        
-        review = self._parse_json_response(response)
+        proj = self._project()
+        
+        prompt = SUBMIT_CODE_TEMPLATE.format(
+            project=proj.name,
+            requirements=list(proj.production_requirements),
+            task=self.learner.current_task,
+            code=code,
+            description=description,
+        )
+        response = self.reviewer.run(prompt, self.learner, on_partial=self._verdict_preview())
+        review = self._parse_json_response(response, ReviewResponse)
+        self._track_output("reviewer", response, review)
         
         if "verdict" in review:
-            self.learner.review_history.append(review)
-            
-            # Track recurring issues
-            for issue in review.get("must_fix", []):
-                if issue not in self.learner.recurring_issues:
-                    self.learner.recurring_issues.append(issue)
+            self.learner.add_review(review)  # Also tracks recurring issues
             
             # If shipped, mark task complete
             if review.get("verdict") == "ship_it":
@@ -1432,9 +2605,12 @@ Review this code. Be direct. Output ONLY valid JSON.
         
         return review
     
-    def review_project(self, target_file: str = None) -> dict:
-        """Review code for current task only - specific file, not whole project."""
-        proj = PROJECTS.get(self.learner.current_project, {})
+    def review_project(self, target_file: Optional[str] = None) -> dict:
+        """Review code for current task only - specific file, not whole project.
+        
+        Always a dict: the parsed review, or {"raw": text} when the reply had no JSON.
+        """
+        proj = self._project()
         
         # Get the specific file content to review
         if target_file:
@@ -1442,28 +2618,18 @@ Review this code. Be direct. Output ONLY valid JSON.
         else:
             file_content = "No specific file provided - reviewing based on task description only."
         
-        prompt = f"""
-PROJECT: {proj.get('name')}
-
-CURRENT TASK: {self.learner.current_task}
-
-REVIEW ONLY THIS FILE (ignore everything else):
-{file_content}
-
-Review ONLY the code shown above. Does it complete the current task?
-Don't mention other files, tests, or things not related to this specific task.
-"""
-        response = self.reviewer.run(prompt, self.learner, include_code=False)  # Don't include all code
-        self._track_output("reviewer", response)
-        
-        review = self._parse_json_response(response)
+        prompt = REVIEW_FILE_TEMPLATE.format(
+            project=proj.name,
+            task=self.learner.current_task,
+            file_content=file_content,
+        )
+        response = self.reviewer.run(prompt, self.learner, include_code=False,  # Don't include all code
+                                     on_partial=self._verdict_preview())
+        review = self._parse_json_response(response, ReviewResponse)
+        self._track_output("reviewer", response, review)
         
         if "verdict" in review:
-            self.learner.review_history.append(review)
-            
-            for issue in review.get("must_fix", []):
-                if issue not in self.learner.recurring_issues:
-                    self.learner.recurring_issues.append(issue)
+            self.learner.add_review(review)  # Also tracks recurring issues
             
             if review.get("verdict") == "ship_it":
                 # Mark task complete - use task description or file name
@@ -1474,31 +2640,40 @@ Don't mention other files, tests, or things not related to this specific task.
             
             self.learner.save()
             
-            # Auto-coaching: run every N reviews
             if self.use_coaching:
-                self.reviews_since_coaching += 1
-                if self.reviews_since_coaching >= self.auto_coach_interval:
-                    print("\n🎓 AUTO-COACHING: Adapting agents based on your performance...")
-                    self.get_coaching_feedback()
-                    self.reviews_since_coaching = 0
-                    print("   Agents updated.\n")
+                self._auto_coach()
         
         return review
     
+    def _auto_coach(self):
+        """Auto-coaching: run a coaching round every N reviews."""
+        if self.batch_auto_coaching and self.pending_coaching_batch:
+            feedback = self.collect_coaching_batch()
+            if feedback is not None:
+                print(f"\n🎓 AUTO-COACHING: Batched feedback applied to {', '.join(feedback) or 'no agents'}.\n")
+        
+        self.reviews_since_coaching += 1
+        if self.reviews_since_coaching < self.auto_coach_interval:
+            return
+        
+        if not self.batch_auto_coaching:
+            print("\n🎓 AUTO-COACHING: Adapting agents based on your performance...")
+            self.get_coaching_feedback()
+            self.reviews_since_coaching = 0
+            print("   Agents updated.\n")
+        elif not self.pending_coaching_batch:
+            # One round in flight at a time; if the last is still processing, retry next review
+            print(f"\n🎓 AUTO-COACHING: {self.queue_coaching_batch()}")
+            self.reviews_since_coaching = 0
+    
     def chat(self, message: str) -> str:
         """Chat about your code. Agent sees your files and teaches."""
-        prompt = f"""
-The learner asks: {message}
-
-Look at their code and TEACH them:
-- If they have a bug, show them EXACTLY where it is and explain WHY it's wrong
-- If they ask "how do I do X", show complete working code with explanations
-- Explain imports, type hints, syntax - don't assume they know production patterns
-- Be specific to THEIR code and THEIR current task
-
-You are a TEACHER. Actually teach. No "go read the docs" or placeholders.
-"""
-        return self.teacher.run(prompt, self.learner, include_code=True)
+        return "".join(self.stream_chat(message))
+    
+    def stream_chat(self, message: str) -> Iterator[str]:
+        """`chat`, yielding the answer as it's generated."""
+        prompt = CHAT_TEMPLATE.format(message=message)
+        return self.teacher.stream(prompt, self.learner, include_code=True)
     
     def run_tests(self) -> str:
         """Run pytest on the project."""
@@ -1544,22 +2719,22 @@ You are a TEACHER. Actually teach. No "go read the docs" or placeholders.
             self.learner.projects_completed.append(self.learner.current_project)
         
         # Find next project
-        project_ids = list(PROJECTS.keys())
-        current_idx = project_ids.index(self.learner.current_project)
+        current_idx = _PROJECT_IDS.index(self.learner.current_project)
         
-        if current_idx + 1 < len(project_ids):
-            self.learner.current_project = project_ids[current_idx + 1]
+        if current_idx + 1 < len(_PROJECT_IDS):
+            self.learner.current_project = _PROJECT_IDS[current_idx + 1]
             self.learner.project_status = "not_started"
             self.learner.tasks_completed = []
             self.learner.days_on_current_project = 0
             self.learner.review_history = []  # Reset for new project
+            self.learner.ship_it_count = 0
             
-            # Auto-save after completing project
-            self.learner.save()
+            # Auto-save after completing project (now, not debounced - it's a milestone)
+            self.learner.flush()
             
-            return f"✅ PROJECT COMPLETE!\n\n🚀 Moving to: {PROJECTS[self.learner.current_project]['name']}"
+            return f"✅ PROJECT COMPLETE!\n\n🚀 Moving to: {self._project().name}"
         else:
-            self.learner.save()
+            self.learner.flush()
             return "🎉 ALL PROJECTS COMPLETE! You've built your portfolio!"
 
 
@@ -1568,37 +2743,127 @@ You are a TEACHER. Actually teach. No "go read the docs" or placeholders.
 # INTERACTIVE CLI
 # =============================================================================
 
-def show_roadmap():
-    print("\n" + "=" * 70)
-    print("🗺️  THE BUILD PATH")
-    print("=" * 70)
+def print_stream(chunks: Iterator[str]):
+    """Print streamed agent text as it arrives."""
+    for text in chunks:
+        print(text, end="", flush=True)
+    print()
+
+
+# The main menu, rendered once; the coaching entries only show with coaching on
+_MENU_HEAD = "\n" + "=" * 50 + """
+CURRICULUM:
+  1. Project details     2. Next task
+  3. Learn concept       4. Full roadmap
+  5. My progress         6. Curriculum check
+
+CODE (agents see your files):
+  r. Review file         c. Chat about code
+  t. Run tests           m. Run mypy
+  f. Show file tree      v. View file
+
+PROJECT:
+  done. Mark project complete
+"""
+_MENU_COACHING = """\
+  coach. Get coaching feedback
+  cb. Batch coaching (half price, applied when ready)
+  !. Report issue (feedback to coaches)
+"""
+_MENU_TAIL = """\
+  p. Learning preferences
+  u. API usage (tokens, cache hits)
+  s. Save    q. Quit
+"""
+_MENU_NO_COACH = _MENU_HEAD + _MENU_TAIL
+_MENU_COACH = _MENU_HEAD + _MENU_COACHING + _MENU_TAIL
+_MENU_BYTES_NO_COACH = _MENU_NO_COACH.encode()
+_MENU_BYTES_COACH = _MENU_COACH.encode()
+
+
+def _write_tty(data: bytes):
+    """Write straight to the terminal's fd, skipping the text layer's encode."""
+    sys.stdout.flush()  # Anything print()ed earlier has to land first
+    fd = sys.stdout.fileno()
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+# Preference answers (full names and their shortcuts) -> the value stored on the profile
+_SIZE_MAP = {"s": "small", "small": "small", "m": "medium", "medium": "medium", "l": "large", "large": "large"}
+_DEPTH_MAP = {"b": "brief", "brief": "brief", "d": "detailed", "detailed": "detailed",
+              "deep": "deep-dive", "deep-dive": "deep-dive"}
+_STYLE_MAP = {"e": "examples", "examples": "examples", "t": "theory-first", "theory": "theory-first",
+              "theory-first": "theory-first", "trial": "trial-error", "trial-error": "trial-error"}
+_PACE_MAP = {"slow": "slow", "s": "slow", "n": "normal", "normal": "normal", "f": "fast", "fast": "fast"}
+
+# Answers that count as "yes" at a (y/n) prompt, after strip().lower()
+_YES = frozenset({"y", "yes", "yeah", "yep"})
+
+
+def _ask(prompt: str, at_eof: str = "") -> str:
+    """`input()` that survives scripted sessions (`printf '1\nq\n' | python OctoSodales.py`).
     
+    Once piped input runs out it answers `at_eof` instead of raising EOFError
+    mid-menu. Piped stdin is already block-buffered, so lines are still read
+    one at a time - a driver that waits for each prompt keeps working.
+    """
+    try:
+        return input(prompt)
+    except EOFError:
+        if sys.stdin.isatty():
+            raise  # Ctrl-D at the terminal: let the caller's handling apply
+        print()
+        return at_eof
+
+
+def _ask_or(prompt: str, default: str) -> str:
+    """`_ask` for prompts with a default: blank or whitespace-only answers get `default`."""
+    return _ask(prompt, at_eof=default).strip() or default
+
+
+def show_roadmap():
+    sys.stdout.write(_roadmap_text())
+
+
+@functools.lru_cache(maxsize=1)
+def _roadmap_text() -> str:
+    """The roadmap never changes within a run (PROJECTS is static), so render it once."""
+    lines = ["", "=" * 70, "🗺️  THE BUILD PATH", "=" * 70]
     for pid, project in PROJECTS.items():
-        print(f"\n{pid}: {project['name']}")
-        print(f"   └─ {project['what_you_build'][:60]}...")
-        print(f"   └─ Ships as: {project['ships_as']}")
-        print(f"   └─ Time: {project['time']}")
+        lines += [
+            f"\n{pid}: {project.name}",
+            f"   └─ {project.what_you_build[:60]}...",
+            f"   └─ Ships as: {project.ships_as}",
+            f"   └─ Time: {project.time}",
+        ]
+    return "\n".join(lines) + "\n"
 
 
 def show_project_details(project_id: str):
-    project = PROJECTS.get(project_id, {})
-    if not project:
-        print("Project not found")
-        return
+    sys.stdout.write(_project_details_text(project_id))
+
+
+@functools.lru_cache(maxsize=32)
+def _project_details_text(project_id: str) -> str:
+    project = PROJECTS.get(project_id)
+    if project is None:
+        return "Project not found\n"
     
-    print(f"\n{'=' * 70}")
-    print(f"📦 {project['name']}")
-    print("=" * 70)
-    print(f"\nWHAT YOU BUILD:\n  {project['what_you_build']}")
-    print(f"\nWHY:\n  {project['why']}")
-    print(f"\nSHIPS AS:\n  {project['ships_as']}")
-    print(f"\nSKILLS YOU'LL LEARN:")
-    for skill in project['skills']:
-        print(f"  • {skill}")
-    print(f"\nPRODUCTION REQUIREMENTS:")
-    for req in project['production_requirements']:
-        print(f"  ✓ {req}")
-    print(f"\nESTIMATED TIME: {project['time']}")
+    lines = [
+        f"\n{'=' * 70}",
+        f"📦 {project.name}",
+        "=" * 70,
+        f"\nWHAT YOU BUILD:\n  {project.what_you_build}",
+        f"\nWHY:\n  {project.why}",
+        f"\nSHIPS AS:\n  {project.ships_as}",
+        "\nSKILLS YOU'LL LEARN:",
+        *(f"  • {skill}" for skill in project.skills),
+        "\nPRODUCTION REQUIREMENTS:",
+        *(f"  ✓ {req}" for req in project.production_requirements),
+        f"\nESTIMATED TIME: {project.time}",
+    ]
+    return "\n".join(lines) + "\n"
 
 
 def run_interactive():
@@ -1621,19 +2886,16 @@ Agents can see your code. No copy/paste needed.
         print(f"   Name: {saved_profile.name}")
         print(f"   Project: {saved_profile.current_project}")
         print(f"   Completed: {len(saved_profile.projects_completed)}/14 projects")
-        resume = input("\nResume? (y/n): ").lower() == "y"
+        resume = _ask("\nResume? (y/n): ").strip().lower() in _YES
         
         if resume:
-            use_coaching = input("Enable coaching layer? (y/n): ").lower() == "y"
-            orchestrator = BuildOrchestrator(use_coaching=use_coaching)
-            orchestrator.learner = saved_profile
-            print(f"\n✅ Resumed as {saved_profile.name}")
+            use_coaching = _ask("Enable coaching layer? (y/n): ").strip().lower() in _YES
         else:
             saved_profile = None
     
     if not saved_profile:
-        name = input("Your name: ") or "Builder"
-        use_coaching = input("Enable coaching layer? (y/n): ").lower() == "y"
+        name = _ask_or("Your name: ", "Builder")
+        use_coaching = _ask("Enable coaching layer? (y/n): ").strip().lower() in _YES
         
         print("\nStarting points:")
         print("  1  = Start from project 1 (recommended)")
@@ -1641,200 +2903,213 @@ Agents can see your code. No copy/paste needed.
         print("  7  = Skip to Eval systems (if you've built LLM tools)")
         print("  10 = Skip to Web/Deployment (if you've built eval systems)")
         
-        start = input("Start at project (1-14): ") or "1"
-        project_id = list(PROJECTS.keys())[int(start) - 1]
-        
-        orchestrator = BuildOrchestrator(use_coaching=use_coaching)
+        start = _ask_or("Start at project (1-14): ", "1")
+        index = int(start) - 1 if start.isdigit() else -1
+        if not 0 <= index < len(_PROJECT_IDS):
+            print(f"⚠️  No project {start!r} - starting from project 1.")
+            index = 0
+        project_id = _PROJECT_IDS[index]
+    
+    # Built in one place whichever way the learner came in
+    orchestrator = BuildOrchestrator(use_coaching=use_coaching)
+    if saved_profile:
+        orchestrator.learner = saved_profile
+        print(f"\n✅ Resumed as {saved_profile.name}")
+    else:
         orchestrator.initialize(name, project_id)
         orchestrator.learner.save()
         
-        print(f"\n✅ Starting with: {PROJECTS[project_id]['name']}")
+        print(f"\n✅ Starting with: {PROJECTS[orchestrator.learner.current_project].name}")
     
     if use_coaching:
         print("✅ Coaching layer ENABLED")
     
-    while True:
-        print("\n" + "=" * 50)
-        print("CURRICULUM:")
-        print("  1. Project details     2. Next task")
-        print("  3. Learn concept       4. Full roadmap")
-        print("  5. My progress         6. Curriculum check")
-        print("\nCODE (agents see your files):")
-        print("  r. Review file         c. Chat about code")
-        print("  t. Run tests           m. Run mypy")
-        print("  f. Show file tree      v. View file")
-        print("\nPROJECT:")
-        print("  done. Mark project complete")
-        if use_coaching:
-            print("  coach. Get coaching feedback")
-            print("  !. Report issue (feedback to coaches)")
-        print("  p. Learning preferences")
-        print("  s. Save    q. Quit")
-        
-        choice = input("\n> ").lower().strip()
-        
-        # Curriculum commands
-        if choice == "1":
-            show_project_details(orchestrator.learner.current_project)
-            
-        elif choice == "2":
-            print("\n🎯 NEXT TASK:")
-            task = orchestrator.get_next_task()
-            print(json.dumps(task, indent=2))
-            
-        elif choice == "3":
-            topic = input("What do you need to learn? ")
-            print(f"\n📖 LESSON: {topic}")
-            print("-" * 40)
-            print(orchestrator.get_lesson(topic))
-            
-        elif choice == "4":
-            show_roadmap()
-            
-        elif choice == "5":
-            print(orchestrator.learner.to_context())
-        
-        elif choice == "6":
-            print("\n📊 CURRICULUM CHECK:")
+    # Curriculum commands
+    def project_details():
+        show_project_details(orchestrator.learner.current_project)
+    
+    def next_task():
+        print("\n🎯 NEXT TASK:")
+        task = orchestrator.get_next_task()
+        print(_json_text(task))
+    
+    def lesson():
+        topic = _ask("What do you need to learn? ")
+        print(f"\n📖 LESSON: {topic}")
+        print("-" * 40)
+        print_stream(orchestrator.stream_lesson(topic))
+    
+    def progress():
+        print(orchestrator.learner.to_context())
+    
+    def curriculum_check():
+        print("\n📊 CURRICULUM CHECK:")
+        print("-" * 40)
+        check = orchestrator.get_curriculum_check()
+        print(_json_text(check))
+    
+    # Code commands (agents see your files)
+    def review():
+        print("\n📝 REVIEW CODE")
+        print(f"Current task: {orchestrator.learner.current_task or 'None set - get a task first (press 2)'}")
+        print("\nYour files:")
+        print(orchestrator.show_tree())
+        target = _ask("\nWhich file to review? (e.g. src/cli_file_processor/cli.py): ").strip()
+        if target:
+            print(f"\n📝 REVIEWING: {target}")
             print("-" * 40)
-            check = orchestrator.get_curriculum_check()
-            print(json.dumps(check, indent=2))
-        
-        # Code commands (agents see your files)
-        elif choice == "r":
-            print("\n📝 REVIEW CODE")
-            print(f"Current task: {orchestrator.learner.current_task or 'None set - get a task first (press 2)'}")
-            print("\nYour files:")
-            print(orchestrator.show_tree())
-            target = input("\nWhich file to review? (e.g. src/cli_file_processor/cli.py): ").strip()
-            if target:
-                print(f"\n📝 REVIEWING: {target}")
-                print("-" * 40)
-                review = orchestrator.review_project(target)
-                print(json.dumps(review, indent=2) if isinstance(review, dict) else review)
+            print(_json_text(orchestrator.review_project(target)))
+        else:
+            print("No file specified.")
+    
+    def chat():
+        question = _ask("Ask about your code: ")
+        print("\n💬 RESPONSE:")
+        print("-" * 40)
+        print_stream(orchestrator.stream_chat(question))
+    
+    def tests():
+        print("\n🧪 RUNNING TESTS...")
+        print("-" * 40)
+        print(orchestrator.run_tests())
+    
+    def typecheck():
+        print("\n🔍 RUNNING MYPY...")
+        print("-" * 40)
+        print(orchestrator.run_typecheck())
+    
+    def tree():
+        print("\n📁 PROJECT STRUCTURE:")
+        print("-" * 40)
+        print(orchestrator.show_tree())
+    
+    def view_file():
+        filepath = _ask("File path (relative): ")
+        print(f"\n📄 {filepath}:")
+        print("-" * 40)
+        print(orchestrator.read_file(filepath))
+    
+    # Project commands
+    def done():
+        confirm = _ask("Mark project complete? (y/n): ")
+        if confirm.strip().lower() in _YES:
+            result = orchestrator.complete_project()
+            print(f"\n{result}")
+    
+    def coach():
+        print("\n🎓 COACHING FEEDBACK:")
+        print("-" * 40)
+        print("Analyzing agent performance...\n")
+        feedback = orchestrator.get_coaching_feedback()
+        # One write for the whole report rather than two prints per coach
+        sys.stdout.write("".join(f"\n{agent.upper()} COACH:\n{coach_feedback}\n"
+                                 for agent, coach_feedback in feedback.items()))
+    
+    def coaching_batch():
+        if orchestrator.pending_coaching_batch:
+            feedback = orchestrator.collect_coaching_batch()
+            if feedback is None:
+                print("\n⏳ Coaching batch still processing - check back later.")
             else:
-                print("No file specified.")
-        
-        elif choice == "c":
-            question = input("Ask about your code: ")
-            print("\n💬 RESPONSE:")
-            print("-" * 40)
-            print(orchestrator.chat(question))
-        
-        elif choice == "t":
-            print("\n🧪 RUNNING TESTS...")
-            print("-" * 40)
-            print(orchestrator.run_tests())
-        
-        elif choice == "m":
-            print("\n🔍 RUNNING MYPY...")
-            print("-" * 40)
-            print(orchestrator.run_typecheck())
-        
-        elif choice == "f":
-            print("\n📁 PROJECT STRUCTURE:")
-            print("-" * 40)
-            print(orchestrator.show_tree())
-        
-        elif choice == "v":
-            filepath = input("File path (relative): ")
-            print(f"\n📄 {filepath}:")
-            print("-" * 40)
-            print(orchestrator.read_file(filepath))
-        
-        # Project commands
-        elif choice == "done":
-            confirm = input("Mark project complete? (y/n): ")
-            if confirm.lower() == "y":
-                result = orchestrator.complete_project()
-                print(f"\n{result}")
+                print(f"\n✅ Coaching batch applied to: {', '.join(feedback) or 'no agents'}")
+        else:
+            print(f"\n{orchestrator.queue_coaching_batch()}")
+    
+    def report_issue():
+        print("\n⚠️  REPORT ISSUE TO COACHES")
+        print("-" * 40)
+        print("Describe what went wrong. Examples:")
+        print("  - 'Teacher taught X but Challenger expected Y'")
+        print("  - 'Lesson was too vague, didn't explain Z'")
+        print("  - 'Task required refactoring instead of building new'")
+        print()
+        issue = _ask("Your issue: ").strip()
+        if issue:
+            print("\nRouting to coaches...")
+            orchestrator.report_issue(issue)
+            print("✅ Issue reported. Coaches will adjust agents.")
+    
+    def preferences():
+        print("\n⚙️  LEARNING PREFERENCES")
+        print("=" * 40)
+        print(f"Current settings:")
+        print(f"  Task size: {orchestrator.learner.task_size}")
+        print(f"  Explanation depth: {orchestrator.learner.explanation_depth}")
+        print(f"  Learning style: {orchestrator.learner.learning_style}")
+        print(f"  Pace: {orchestrator.learner.pace}")
+        print()
+        
+        print("1. Task size (how big are assignments?)")
+        print("   [s]mall (15-30 min)  [m]edium (30-60 min)  [l]arge (1-2 hours)")
+        size = _ask("   > ").lower().strip()
+        orchestrator.learner.task_size = _SIZE_MAP.get(size, orchestrator.learner.task_size)
+        
+        print("\n2. Explanation depth (how detailed are lessons?)")
+        print("   [b]rief (quick, minimal)  [d]etailed (thorough)  [deep] (comprehensive)")
+        depth = _ask("   > ").lower().strip()
+        orchestrator.learner.explanation_depth = _DEPTH_MAP.get(depth, orchestrator.learner.explanation_depth)
+        
+        print("\n3. Learning style (how do you learn best?)")
+        print("   [e]xamples (code first, explain after)")
+        print("   [t]heory (explain concept, then code)")
+        print("   [trial] (struggle first, then help)")
+        style = _ask("   > ").lower().strip()
+        orchestrator.learner.learning_style = _STYLE_MAP.get(style, orchestrator.learner.learning_style)
+        
+        print("\n4. Pace (how fast do we move?)")
+        print("   [slow] (extra scaffolding)  [n]ormal  [f]ast (challenge me)")
+        pace = _ask("   > ").lower().strip()
+        orchestrator.learner.pace = _PACE_MAP.get(pace, orchestrator.learner.pace)
         
-        elif choice == "coach" and use_coaching:
-            print("\n🎓 COACHING FEEDBACK:")
-            print("-" * 40)
-            print("Analyzing agent performance...\n")
-            feedback = orchestrator.get_coaching_feedback()
-            for agent, coach_feedback in feedback.items():
-                print(f"\n{agent.upper()} COACH:")
-                print(coach_feedback)
-        
-        elif choice == "!" and use_coaching:
-            print("\n⚠️  REPORT ISSUE TO COACHES")
-            print("-" * 40)
-            print("Describe what went wrong. Examples:")
-            print("  - 'Teacher taught X but Challenger expected Y'")
-            print("  - 'Lesson was too vague, didn't explain Z'")
-            print("  - 'Task required refactoring instead of building new'")
-            print()
-            issue = input("Your issue: ").strip()
-            if issue:
-                print("\nRouting to coaches...")
-                orchestrator.report_issue(issue)
-                print("✅ Issue reported. Coaches will adjust agents.")
-        
-        elif choice == "p":
-            print("\n⚙️  LEARNING PREFERENCES")
-            print("=" * 40)
-            print(f"Current settings:")
-            print(f"  Task size: {orchestrator.learner.task_size}")
-            print(f"  Explanation depth: {orchestrator.learner.explanation_depth}")
-            print(f"  Learning style: {orchestrator.learner.learning_style}")
-            print(f"  Pace: {orchestrator.learner.pace}")
-            print()
-            
-            print("1. Task size (how big are assignments?)")
-            print("   [s]mall (15-30 min)  [m]edium (30-60 min)  [l]arge (1-2 hours)")
-            size = input("   > ").lower().strip()
-            if size in ['s', 'small']:
-                orchestrator.learner.task_size = "small"
-            elif size in ['m', 'medium']:
-                orchestrator.learner.task_size = "medium"
-            elif size in ['l', 'large']:
-                orchestrator.learner.task_size = "large"
-            
-            print("\n2. Explanation depth (how detailed are lessons?)")
-            print("   [b]rief (quick, minimal)  [d]etailed (thorough)  [deep] (comprehensive)")
-            depth = input("   > ").lower().strip()
-            if depth in ['b', 'brief']:
-                orchestrator.learner.explanation_depth = "brief"
-            elif depth in ['d', 'detailed']:
-                orchestrator.learner.explanation_depth = "detailed"
-            elif depth in ['deep', 'deep-dive']:
-                orchestrator.learner.explanation_depth = "deep-dive"
-            
-            print("\n3. Learning style (how do you learn best?)")
-            print("   [e]xamples (code first, explain after)")
-            print("   [t]heory (explain concept, then code)")
-            print("   [trial] (struggle first, then help)")
-            style = input("   > ").lower().strip()
-            if style in ['e', 'examples']:
-                orchestrator.learner.learning_style = "examples"
-            elif style in ['t', 'theory', 'theory-first']:
-                orchestrator.learner.learning_style = "theory-first"
-            elif style in ['trial', 'trial-error']:
-                orchestrator.learner.learning_style = "trial-error"
-            
-            print("\n4. Pace (how fast do we move?)")
-            print("   [slow] (extra scaffolding)  [n]ormal  [f]ast (challenge me)")
-            pace = input("   > ").lower().strip()
-            if pace in ['slow', 's']:
-                orchestrator.learner.pace = "slow"
-            elif pace in ['n', 'normal']:
-                orchestrator.learner.pace = "normal"
-            elif pace in ['f', 'fast']:
-                orchestrator.learner.pace = "fast"
-            
-            orchestrator.learner.save()
-            print("\n✅ Preferences updated! Agents will adapt to your style.")
+        orchestrator.learner.save()
+        print("\n✅ Preferences updated! Agents will adapt to your style.")
+    
+    def save():
+        try:
+            # Confirmed here rather than by the log line, which would arrive from the
+            # logging thread on top of the redrawn menu
+            orchestrator.learner.flush(quiet=True)
+        except OSError as e:
+            print(f"\n❌ Could not save progress: {e}")
+        else:
+            print(f"\n💾 Progress saved to {SAVE_FILE}")
+    
+    def usage():
+        print("\n📈 API USAGE THIS SESSION:")
+        print("-" * 40)
+        print(orchestrator.usage_report())
+    
+    # Menu choice -> handler, built once; "q" is handled by the loop itself
+    commands: Dict[str, Callable[[], None]] = {
+        "1": project_details, "2": next_task, "3": lesson, "4": show_roadmap,
+        "5": progress, "6": curriculum_check,
+        "r": review, "c": chat, "t": tests, "m": typecheck, "f": tree, "v": view_file,
+        "done": done, "p": preferences, "u": usage, "s": save,
+    }
+    if use_coaching:
+        commands.update({"coach": coach, "cb": coaching_batch, "!": report_issue})
+    
+    menu = _MENU_COACH if use_coaching else _MENU_NO_COACH
+    menu_bytes = _MENU_BYTES_COACH if use_coaching else _MENU_BYTES_NO_COACH
+    # Redirected or captured output keeps going through sys.stdout
+    to_tty = sys.stdout.isatty()
+    while True:
+        if to_tty:
+            _write_tty(menu_bytes)
+        else:
+            sys.stdout.write(menu)
         
-        elif choice == "s":
-            orchestrator.learner.save()
-            
-        elif choice == "q":
-            orchestrator.learner.save()
+        choice = _ask("\n> ", at_eof="q").lower().strip()
+        if choice == "q":
+            orchestrator.learner.flush()
             print("\nProgress saved. Keep building! 🔨")
             break
-
+        
+        handler = commands.get(choice)
+        if handler is not None:
+            handler()
 
 if __name__ == "__main__":
+    setup_logging()
+    warm_up()  # Runs while the user reads the banner and answers the setup prompts
     run_interactive()
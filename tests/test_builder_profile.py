@@ -0,0 +1,64 @@
+"""Loading saved progress (run with `python -m unittest` from the repo root)."""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import OctoSodales
+from OctoSodales import BuilderProfile
+
+
+class LoadTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        save_file = Path(tmp.name) / "progress.json"
+        self.save_file = save_file
+        for name, value in (("SAVE_FILE", save_file), ("SAVE_LOG", save_file.with_suffix(".jsonl"))):
+            patcher = mock.patch.object(OctoSodales, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_non_string_enum_fields_fall_back_to_defaults(self):
+        self.save_file.write_text(json.dumps({
+            "name": "Ada",
+            "projects_completed": ["01_cli_file_processor"],
+            "pace": None,
+            "task_size": 3,
+        }))
+
+        profile = BuilderProfile.load()
+
+        self.assertIsNotNone(profile)
+        self.assertEqual(profile.name, "Ada")
+        self.assertEqual(profile.projects_completed, ["01_cli_file_processor"])
+        self.assertEqual(profile.pace, "normal")
+        self.assertEqual(profile.task_size, "medium")
+
+    def test_log_replays_even_when_the_snapshot_mtime_is_ahead_of_the_clock(self):
+        profile = BuilderProfile(name="Ada")
+        profile.flush()  # first write is a full snapshot
+        profile.pace = "fast"
+        profile.flush()  # this one is a log record
+        # A synced home dir or an NTP step can leave the snapshot "newer" than the record
+        ahead = time.time() + 3600
+        os.utime(self.save_file, (ahead, ahead))
+
+        self.assertEqual(BuilderProfile.load().pace, "fast")
+
+    def test_changes_to_a_save_without_a_snapshot_id_survive_a_reload(self):
+        # Saves from before snapshot ids existed are a bare JSON object
+        self.save_file.write_text(json.dumps({"name": "Ada", "pace": "normal"}))
+        profile = BuilderProfile.load()
+        profile.pace = "fast"
+        profile.flush()
+
+        self.assertEqual(BuilderProfile.load().pace, "fast")
+
+
+if __name__ == "__main__":
+    unittest.main()